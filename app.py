@@ -1,18 +1,34 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
-import altair as alt
-from streamlit_folium import st_folium
-import folium
-import requests
-import re
+import hmac
+import os
 import time
-from streamlit_gsheets import GSheetsConnection
-
-GEOJSON_URL = 'https://raw.githubusercontent.com/naufalhajid/Dashboard-Ferizyan/refs/heads/main/data_pelabuhan.geojson'
-GEOJSON_KAB_KEY = 'feature.properties.Nama Pelabuhan'
+# plotly, altair, dan konektor gsheets diimport saat bagian yang memakainya
+# dirender; anggaran waktu import startup dicek dengan `python -m bench.imports`
+from engine.active import ActiveIntervalIndex
+from engine.aggregates import compute_aggregates, generation_table, office_type_counts
+from engine.cache import ResultCache
+from engine.charts import chart_key, top_n_rollup
+from engine.export import EXPORT_FORMATS, XLSX_MAX_ROWS, ExportCache
+from engine.filters import FILTER_COLUMNS, FilterIndex, entry_date_bounds, filter_state_key, resolve_date_range
+from engine.gazetteer import load_port_index
+from engine.grid import DEFAULT_PAGE_SIZE, PAGE_SIZES, GridIndex, page_count
+from engine.headcount import previous_period_end
+from engine.maplayer import map_markers, render_map_html
+from engine.metrics import METRICS, span, track_cache
+from engine.refresh import RefreshScheduler
+from engine.schema import RAW_COLUMNS, RAW_DTYPES
+from engine.snapshot import DEFAULT_SNAPSHOT_PATH
+from engine.sources import DEFAULT_TABLE, GSheetsSource, source_from_path
+from engine.sync import IncrementalSync
+from engine.views import DataView
+
+# Panel performa hanya untuk admin: DASHBOARD_PERF_PANEL=1, atau ?perf=<token> di URL
+# bila DASHBOARD_PERF_TOKEN diset (tanpa token, parameter URL diabaikan)
+PERF_PANEL = os.environ.get('DASHBOARD_PERF_PANEL') == '1'
+PERF_TOKEN = os.environ.get('DASHBOARD_PERF_TOKEN')
+run_started = time.perf_counter()
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -22,8 +38,7 @@ st.set_page_config(
 )
 
 # --- CUSTOM CSS ---
-st.markdown("""
-    <style>
+PAGE_CSS = """
     /* Main Background */
     .main {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -142,22 +157,22 @@ st.markdown("""
     .stProgress > div > div > div > div {
         background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
     }
-    </style>
-""", unsafe_allow_html=True)
+"""
 
-# --- CUSTOM FUNCTIONS ---
-@st.cache_data
-def safe_date_conversion(df, date_cols):
-    """Konversi kolom tanggal dengan aman"""
-    for col in date_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-    return df
+@st.cache_resource
+def page_style():
+    """CSS halaman tanpa komentar/spasi berlebih, dibangun sekali per proses."""
+    import re
+
+    css = re.sub(r'/\*.*?\*/', '', PAGE_CSS, flags=re.S)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', ' '.join(css.split()))
+    return f"<style>{css}</style>"
 
-@st.cache_data
-def to_csv(df):
-    """Convert DataFrame to CSV"""
-    return df.to_csv(index=False).encode('utf-8')
+# Hanya berisi <style>, jadi st.html mengirimnya ke event container tanpa
+# membuat elemen markdown di halaman
+st.html(page_style())
+
+# --- CUSTOM FUNCTIONS ---
 
 
 # --- HEADER ---
@@ -172,194 +187,227 @@ st.markdown("Pastikan Anda sudah membuat file `.streamlit/secrets.toml` dengan b
 # Ganti dengan URL Google Sheet Anda
 spreadsheet_url = "https://docs.google.com/spreadsheets/d/1qDWIuC1Sc5QEIoujNkm8jb0_IxQZMsTypRdkZPkHdGU/edit?usp=sharing"
 
-# Menggunakan "gsheets" sebagai nama koneksi
-conn = st.connection("gsheets", type=GSheetsConnection)
-
-@st.cache_data(ttl=3600)
-def load_and_clean_data(df_raw):
-    """Memuat, membersihkan, dan mengubah data dari file yang diunggah."""
-    df = df_raw.copy() # Buat salinan untuk menghindari modifikasi data asli di cache
-    # --- 1. GANTI NAMA KOLOM ---
-    rename_map = {
-        'Status_Kepegawaian': 'Status Kepegawaian', 'Sub_unker': 'Sub Unit Kerja',
-        'Unit_Kerja': 'Unit Kerja', 'TglLahir': 'Tanggal Lahir',
-        'Keaktifan': 'Status Aktif', 'Klasifikasi_Jabatan': 'Klasifikasi Jabatan',
-        'Department_Name': 'Department Name', 'Retirement Date': 'Tanggal Pensiun',
-        'Jenis_Kelamin': 'Jenis Kelamin', 'Lokasi_Kerja': 'Lokasi Kerja',
-        'Date of Joining': 'Tanggal Masuk', 'Date Of Exit': 'Tanggal Keluar',
-        'Kelas_Kapal': 'Kelas Kapal'
-    }
-    df.rename(columns=rename_map, inplace=True)
-
-    # --- 2. KONVERSI TANGGAL ---
-    date_cols = ['Tanggal Masuk', 'Tanggal Keluar', 'Tanggal Lahir', 'Tanggal Pensiun']
-    df = safe_date_conversion(df, date_cols)
-    today = pd.Timestamp(datetime.now().date())
-
-    # --- 3. CLEANING DATA ---
-    if 'Status Kepegawaian' in df.columns:
-        df['Status Kepegawaian'] = df['Status Kepegawaian'].astype(str).str.upper().str.strip()
-        df.loc[df['Status Kepegawaian'].str.contains('CONTRACT', na=False), 'Status Kepegawaian'] = 'PKWT'
-        df.loc[df['Status Kepegawaian'].str.contains('EMPLOYEE', na=False), 'Status Kepegawaian'] = 'PKWTT'
-
-    if 'Jenis Kelamin' in df.columns:
-        df['Jenis Kelamin'] = df['Jenis Kelamin'].astype(str).str.upper().str.strip()
-        df.loc[df['Jenis Kelamin'].str.startswith('L', na=False), 'Jenis Kelamin'] = 'Laki-laki'
-        df.loc[df['Jenis Kelamin'].str.startswith('P', na=False), 'Jenis Kelamin'] = 'Perempuan'
-
-    if 'Sub Unit Kerja' in df.columns:
-        df['Sub Unit Kerja'] = df['Sub Unit Kerja'].astype(str).str.upper().str.strip()
-
-    # --- 4. UPDATE STATUS BERDASARKAN TANGGAL ---
-    if 'Tanggal Pensiun' in df.columns:
-        df.loc[(df['Tanggal Pensiun'] <= today) & df['Tanggal Pensiun'].notna(), 'Status Kepegawaian'] = 'PENSIUN'
-    if 'Tanggal Keluar' in df.columns:
-        df.loc[(df['Tanggal Keluar'] <= today) & df['Tanggal Keluar'].notna(), 'Status Kepegawaian'] = 'RESIGN'
-
-    # --- 5. TENTUKAN STATUS AKTIF/TIDAK AKTIF ---
-    if 'Status Kepegawaian' in df.columns:
-        exit_statuses = ['PENSIUN', 'RESIGN', 'TERMINATED', 'CUTI']
-        df['Status Aktif'] = 'Aktif'
-        df.loc[df['Status Kepegawaian'].isin(exit_statuses), 'Status Aktif'] = 'Tidak Aktif'
-
-    # --- 6. HAPUS KOLOM KOSONG ---
-    missing_perc = (df.isnull().sum() / len(df)) * 100
-    cols_to_drop = missing_perc[missing_perc == 100].index
-    df.drop(columns=cols_to_drop, inplace=True)
-    
-    return df
-
-def filter_active_only(df, today=pd.Timestamp(datetime.now().date())):
-    """Dari DataFrame apa pun, ambil hanya karyawan yang AKTIF HARI INI."""
-    if df.empty:
-        return df
-
-    # 1. Karyawan harus sudah masuk
-    mask = (df['Tanggal Masuk'].notna()) & (df['Tanggal Masuk'] <= today)
-
-    # 2. Karyawan harus belum keluar (Tanggal Keluar >= Hari Ini ATAU kosong)
-    if 'Tanggal Keluar' in df.columns:
-        mask &= (df['Tanggal Keluar'].isna()) | (df['Tanggal Keluar'] >= today)
-    if 'Tanggal Pensiun' in df.columns:
-        mask &= (df['Tanggal Pensiun'].isna()) | (df['Tanggal Pensiun'] >= today)
-
-    # 3. Status kepegawaian bukan merupakan status keluar
-    if 'Status Kepegawaian' in df.columns:
-        exit_statuses = ['RESIGN', 'PENSIUN', 'TERMINATED']
-        mask &= ~df['Status Kepegawaian'].isin(exit_statuses)
+# Sumber lokal opsional (XLSX/CSV/Parquet/SQLite/DuckDB) menggantikan Google
+# Sheets, mis. DASHBOARD_SOURCE="Example Data.xlsx" untuk uji atau benchmark offline
+LOCAL_SOURCE_PATH = os.environ.get('DASHBOARD_SOURCE')
+LOCAL_SOURCE_TABLE = os.environ.get('DASHBOARD_SOURCE_TABLE', DEFAULT_TABLE)
+
+# Interval refresh data dari Google Sheets (detik)
+REFRESH_INTERVAL = 3600
+
+def get_source():
+    """Sumber data mentah: file/database lokal bila diset, selain itu Google Sheets.
+
+    Hanya kolom skema dashboard yang dibaca (lihat engine/schema.py).
+    """
+    if LOCAL_SOURCE_PATH:
+        return source_from_path(LOCAL_SOURCE_PATH, table=LOCAL_SOURCE_TABLE, columns=RAW_COLUMNS, dtype=RAW_DTYPES)
+    from streamlit_gsheets import GSheetsConnection
+
+    # Menggunakan "gsheets" sebagai nama koneksi
+    conn = st.connection("gsheets", type=GSheetsConnection)
+    return GSheetsSource(conn, spreadsheet_url, columns=RAW_COLUMNS)
+
+@st.cache_resource
+def get_data_sync():
+    """Sinkronisasi inkremental sumber data, satu per proses.
+
+    Saat cold start, snapshot lokal terakhir langsung dipakai. Setelah itu
+    data di-refresh berkala oleh scheduler di background.
+    """
+    sync = IncrementalSync(get_source(), snapshot_path=DEFAULT_SNAPSHOT_PATH)
+    restored = sync.restore() is not None
+    RefreshScheduler(sync, interval=REFRESH_INTERVAL).start(run_immediately=restored)
+    return sync
+
+def load_and_clean_data():
+    """Data bersih terbaru; versi lama tetap dipakai selama refresh berjalan."""
+    return get_data_sync().get(max_age=REFRESH_INTERVAL)
+
+@track_cache('filter_index', st.cache_resource(max_entries=4))
+def get_filter_index(_df, version, columns):
+    """Indeks filter sidebar, dibangun sekali per versi dataset."""
+    return FilterIndex(_df, columns)
+
+@track_cache('interval_index', st.cache_resource(max_entries=4))
+def get_interval_index(_df, version, today):
+    """Interval aktif karyawan, dibangun sekali per versi dataset dan tanggal."""
+    return ActiveIntervalIndex(_df, today)
+
+@st.cache_resource
+def get_aggregate_cache():
+    """Cache agregat bersama untuk semua sesi dalam proses ini."""
+    cache = ResultCache(max_entries=64, ttl=REFRESH_INTERVAL)
+    METRICS.register_collector('aggregates', cache.stats)
+    return cache
+
+def get_aggregates(df_filtered, df_base, state_key, today):
+    """Agregat dashboard per (versi dataset, state filter, tanggal), lintas sesi."""
+    previous_date = previous_period_end()
+    key = (df_base.attrs.get('version'), state_key, today, previous_date.normalize())
+    def compute():
+        with span('aggregates') as s:
+            s.rows = len(df_filtered)
+            return compute_aggregates(
+                df_filtered, df_base, get_interval_index(df_base, key[0], today), today, previous_date
+            )
+    return get_aggregate_cache().get_or_compute(key, compute)
+
+@track_cache('grid_index', st.cache_resource(max_entries=4))
+def get_grid_index(_df, version):
+    """Urutan sort dan hasil pencarian tabel, per versi dataset."""
+    return GridIndex(_df)
+
+@st.cache_resource
+def get_chart_cache():
+    """Spec chart per (nama chart, isi data), dibagi antar sesi."""
+    cache = ResultCache(max_entries=256, ttl=REFRESH_INTERVAL)
+    METRICS.register_collector('chart_specs', cache.stats)
+    return cache
+
+def render_plotly(name, data, build):
+    """Figure `build(data)` dari cache spec chart (figure tetap diserialisasi dan dikirim setiap rerun)."""
+    fig = get_chart_cache().get_or_compute(chart_key(name, data), lambda: build(data))
+    with span('chart.plotly'):
+        st.plotly_chart(fig, use_container_width=True)
+
+def render_altair(name, data, build):
+    """Spec Vega-Lite `build(data).to_dict()` dari cache spec chart (spec tetap dikirim setiap rerun)."""
+    spec = get_chart_cache().get_or_compute(chart_key(name, data), lambda: build(data).to_dict())
+    with span('chart.altair'):
+        st.vega_lite_chart(spec=spec, use_container_width=True)
+
+def render_perf_panel():
+    """Durasi per tahap, baris/byte yang diproses, dan hit/miss cache di proses ini."""
+    with st.sidebar.expander("⏱️ Performa (admin)"):
+        stages = pd.DataFrame.from_dict(METRICS.stages(), orient='index')
+        if not stages.empty:
+            stages = stages.sort_values('seconds', ascending=False)
+            st.dataframe(
+                stages[['count', 'avg_ms', 'max_ms', 'last_ms', 'rows', 'bytes']].round(1),
+                use_container_width=True
+            )
+        caches = pd.DataFrame.from_dict(METRICS.caches(), orient='index')
+        if not caches.empty:
+            st.dataframe(caches.round(3), use_container_width=True)
+        if METRICS.log_path:
+            st.caption(f"Log span: `{METRICS.log_path}`")
+
+def perf_panel_allowed():
+    """Panel performa boleh tampil: flag env, atau token URL yang cocok."""
+    if PERF_PANEL:
+        return True
+    token = st.query_params.get('perf')
+    return bool(PERF_TOKEN and token) and hmac.compare_digest(token, PERF_TOKEN)
+
+@st.fragment
+def render_data_grid(view, key, height=400):
+    """Tabel berhalaman: cari, sort, dan potong halaman di server; hanya satu halaman yang dikirim."""
+    grid = get_grid_index(view.base, view.attrs.get('version'))
+    page_key = f"{key}_page"
+
+    def reset_page():
+        st.session_state[page_key] = 1
+
+    col_search, col_sort, col_order, col_size = st.columns([3, 2, 1, 1])
+    with col_search:
+        search = st.text_input("🔎 Cari", key=f"{key}_search", placeholder="Cari teks di semua kolom...", on_change=reset_page)
+    with col_sort:
+        sort_col = st.selectbox(
+            "Urutkan berdasarkan", [None, *view.columns], key=f"{key}_sort",
+            format_func=lambda col: "-" if col is None else col, on_change=reset_page
+        )
+    with col_order:
+        ascending = st.selectbox("Arah", ["Naik", "Turun"], key=f"{key}_order", on_change=reset_page) == "Naik"
+    with col_size:
+        page_size = st.selectbox(
+            "Baris", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key=f"{key}_size", on_change=reset_page
+        )
 
-    return df[mask]
+    rows = grid.query(view.rows, search, sort_col, ascending)
+    n_pages = page_count(len(rows), page_size)
+    # Jumlah halaman bisa menyusut saat filter berubah
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+
+    st.dataframe(grid.page(rows, st.session_state.get(page_key, 1), page_size), use_container_width=True, height=height)
+
+    col_page, col_info = st.columns([1, 3])
+    with col_page:
+        page = st.number_input("Halaman", min_value=1, max_value=n_pages, step=1, key=page_key)
+    with col_info:
+        first = (page - 1) * page_size + 1 if len(rows) else 0
+        last = min(page * page_size, len(rows))
+        st.caption(f"Baris {first:,}–{last:,} dari {len(rows):,} (halaman {page} dari {n_pages})")
+
+@st.cache_resource
+def get_export_cache():
+    """Cache file ekspor di disk, bersama untuk semua sesi."""
+    return ExportCache()
+
+@st.fragment
+def render_export(view, export_key, file_prefix, label):
+    """Pilihan format dan tombol download; file baru dibuat saat tombol ditekan."""
+    formats = [fmt for fmt in EXPORT_FORMATS if fmt != 'XLSX' or len(view) <= XLSX_MAX_ROWS]
+    col_format, col_button = st.columns([1, 2])
+    with col_format:
+        fmt = st.selectbox("Format", formats, key=f"{file_prefix}_export_format", label_visibility="collapsed")
+    extension, mime = EXPORT_FORMATS[fmt]
+    with col_button:
+        st.download_button(
+            label=f"{label} ({fmt})",
+            data=lambda: get_export_cache().read(view, fmt, export_key),
+            file_name=f"{file_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+            mime=mime,
+            on_click="ignore",
+            use_container_width=True
+        )
 
 try:
-    with st.spinner("⏳ Menghubungkan ke Google Sheets..."):
-        df_raw = conn.read(spreadsheet=spreadsheet_url, ttl=3600)
-    
-    st.success(f"✅ Berhasil memuat data dari Google Sheets!")
-    
-    with st.spinner("⏳ Membersihkan dan memproses data..."):
-        df_cleaned = load_and_clean_data(df_raw)
+    with st.spinner("⏳ Memuat data karyawan..."):
+        df_cleaned = load_and_clean_data()
+    data_sync = get_data_sync()
+
+    st.success(f"✅ Berhasil memuat data dari {data_sync.source.label}!")
+
+    # Refresh background yang gagal tidak menghentikan dashboard; data terakhir tetap dipakai
+    if data_sync.last_error is not None:
+        st.warning(
+            f"⚠️ Refresh data terakhir gagal ({type(data_sync.last_error).__name__}). "
+            f"Menampilkan data per {datetime.fromtimestamp(data_sync.refreshed_at):%d-%m-%Y %H:%M}; "
+            "refresh dicoba lagi otomatis."
+        )
 
     st.markdown("### Analisis Komprehensif Data Karyawan")
 
     # --- TABS ---
+    # Tab yang dipilih disimpan di session state; hanya tab itu yang dijalankan
     tab_analysis, tab_map, tab_raw_data = st.tabs([
         "Dashboard Analisis","Peta Lokasi Karyawan", 
         "Data Mentah"
-    ])
+    ], key="active_tab", on_change="rerun")
     # ========================================
     # TAB: DATA MENTAH
     # ========================================
-    with tab_raw_data:
+    @st.fragment
+    def render_raw_tab(df_cleaned, today):
         st.header("Data Asli")
-        st.info("Data mentah setelah penggantian nama kolom dan *cleaning* karakter.")
-        st.dataframe(df_cleaned, use_container_width=True, height=500)
+        st.info("Data mentah setelah penggantian nama kolom dan *cleaning* karakter. Hanya kolom yang dipakai dashboard yang dimuat.")
+        render_data_grid(DataView(df_cleaned), key="raw", height=500)
         
-        csv_raw = to_csv(df_cleaned)
-        st.download_button(
-            label="Download Data Mentah (CSV)",
-            data=csv_raw,
-            file_name=f"cleaned_raw_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
+        render_export(
+            DataView(df_cleaned), f"raw_{df_cleaned.attrs.get('version')}_{today:%Y%m%d}",
+            "cleaned_raw_data", "Download Data Mentah"
         )
         
     # ===============================
     # 2️⃣ FILTER SIDEBAR
     # ===============================
-    st.sidebar.markdown("## 🎛️ Filter Dashboard")
-    st.sidebar.markdown("---")
-
-    # Inisialisasi session state untuk filter
-    if 'start_date' not in st.session_state:
-        st.session_state['start_date'] = None
-    if 'end_date' not in st.session_state:
-        st.session_state['end_date'] = None
-    if 'filter_values' not in st.session_state:
-        st.session_state['filter_values'] = {}
-
-    # Fungsi untuk reset filter
-    def reset_filters():
-        st.session_state['start_date'] = None
-        st.session_state['end_date'] = None
-        st.session_state['filter_values'] = {}
-
-    df_filtered = df_cleaned.copy()
+    # Filter diubah di dalam form dan baru diterapkan saat tombol "Terapkan"
+    # ditekan: mengubah beberapa filter sekaligus hanya memicu satu rerun.
     today = pd.Timestamp(datetime.now().date())
-    active_filters = []
-
-    # --- FILTER TANGGAL ---
-    with st.sidebar.expander("📅 **Filter Tanggal Masuk**", expanded=True):
-        if 'Tanggal Masuk' in df_cleaned.columns:
-            valid_dates = df_cleaned[
-                (df_cleaned['Tanggal Masuk'] <= today) & 
-                (df_cleaned['Tanggal Masuk'].notna())
-            ]['Tanggal Masuk']
-            
-            if not valid_dates.empty:
-                min_date = valid_dates.min().date()
-                max_date = today.date()
-                
-                # Gunakan session_state untuk menyimpan nilai date_input
-                if st.session_state['start_date'] is None:
-                    st.session_state['start_date'] = min_date
-                if st.session_state['end_date'] is None:
-                    st.session_state['end_date'] = max_date
-
-                col_date1, col_date2 = st.columns(2)
-                with col_date1:
-                    start_date = st.date_input("Dari", st.session_state['start_date'], min_value=min_date, max_value=max_date, key="start_date_input")
-                with col_date2:
-                    end_date = st.date_input("Sampai", st.session_state['end_date'], min_value=min_date, max_value=max_date, key="end_date_input")
-
-                # Update session state
-                st.session_state['start_date'] = start_date
-                st.session_state['end_date'] = end_date
-
-                if start_date > end_date:
-                    st.error("❌ Tanggal mulai harus sebelum tanggal akhir")
-                    st.stop()
-                    
-                # Terapkan filter Tanggal Masuk
-                start_datetime = pd.to_datetime(start_date)
-                end_datetime = pd.to_datetime(end_date)
-                
-                df_filtered = df_filtered[
-                    (df_filtered['Tanggal Masuk'] >= start_datetime) &
-                    (df_filtered['Tanggal Masuk'] <= end_datetime)
-                ]
-                
-                active_filters.append(
-                    f"📅 Tanggal: {start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"
-                )
-            else:
-                st.info("Tidak ada data tanggal valid")
-        else:
-            st.info("Kolom 'Tanggal Masuk' tidak ditemukan")
 
-    # --- FILTER KATEGORI ---
-    # Inisialisasi dictionary filter_selection
-    filter_selection = {}
-
-    # Definisi kolom di luar expander agar bisa diakses nanti
+    # Definisi kolom filter
     core_columns = [
         ("Status Kepegawaian", "👤"),
         ("Unit Kerja", "🏭")
@@ -377,65 +425,104 @@ try:
         ("Department Name", "🏷️")
     ]
     all_columns = core_columns + detail_columns + internal_columns
+    filter_index = get_filter_index(df_cleaned, df_cleaned.attrs.get('version'), FILTER_COLUMNS)
+
+    # Rentang Tanggal Masuk yang valid, sekaligus nilai default filter tanggal
+    date_bounds = entry_date_bounds(df_cleaned, today)
+    min_date, max_date = date_bounds or (None, None)
+
+    # Filter yang sudah diterapkan: {'date_range': (mulai, akhir), 'selection': {kolom: [nilai]}}
+    if 'applied_filters' not in st.session_state:
+        st.session_state['applied_filters'] = {}
 
-    def create_multiselect_filter(col_name, icon, df):
+    # Fungsi untuk reset filter
+    def reset_filters():
+        st.session_state['applied_filters'] = {}
+        st.session_state.pop('start_date_input', None)
+        st.session_state.pop('end_date_input', None)
+        for col_name, _ in all_columns:
+            st.session_state.pop(f'filter_{col_name}', None)
+
+    def create_multiselect_filter(col_name, icon, df, selection):
         if col_name in df.columns:
-            unique_values = sorted(df[col_name].dropna().astype(str).unique().tolist())
+            unique_values = filter_index.options[col_name]
             if unique_values:
-                key = f'filter_{col_name}'
-                if key not in st.session_state['filter_values']:
-                    st.session_state['filter_values'][key] = []
-                
-                selected = st.multiselect(
-                    f"{icon} {col_name}", unique_values,
-                    default=st.session_state['filter_values'][key], key=key
-                )
+                selected = st.multiselect(f"{icon} {col_name}", unique_values, key=f'filter_{col_name}')
                 if selected:
-                    filter_selection[col_name] = selected
-
-    with st.sidebar.expander("🔍 **Filter Kategori**", expanded=True):
-        st.markdown("##### 🏢 Organisasi")
-        for col_name, icon in core_columns:
-            create_multiselect_filter(col_name, icon, df_cleaned)
-        st.markdown("##### 📍 Posisi & Lokasi")
-        for col_name, icon in detail_columns:
-            create_multiselect_filter(col_name, icon, df_cleaned)
-        with st.expander("Detail Internal"):
-            for col_name, icon in internal_columns:
-                create_multiselect_filter(col_name, icon, df_cleaned)
-
-    # --- Terapkan Semua Filter Kategori ---
-    for col_name, selected_values in filter_selection.items():
-        if selected_values:
-            df_filtered = df_filtered[
-                df_filtered[col_name].astype(str).isin(selected_values)
-            ]
-            # Cari icon yang sesuai
-            icon = next((i for c, i in all_columns if c == col_name), "")
-            active_filters.append(f"{icon} {col_name}: {', '.join(selected_values)}")
-            
+                    selection[col_name] = selected
+
+    @st.fragment
+    def render_filter_panel():
+        pending_range = None
+        pending_selection = {}
+
+        with st.form("filter_form", border=False):
+            # --- FILTER TANGGAL ---
+            with st.expander("📅 **Filter Tanggal Masuk**", expanded=True):
+                if min_date is not None:
+                    col_date1, col_date2 = st.columns(2)
+                    with col_date1:
+                        start_date = st.date_input("Dari", min_date, min_value=min_date, max_value=max_date, key="start_date_input")
+                    with col_date2:
+                        end_date = st.date_input("Sampai", max_date, min_value=min_date, max_value=max_date, key="end_date_input")
+                    pending_range = (start_date, end_date)
+                elif 'Tanggal Masuk' in df_cleaned.columns:
+                    st.info("Tidak ada data tanggal valid")
+                else:
+                    st.info("Kolom 'Tanggal Masuk' tidak ditemukan")
+
+            # --- FILTER KATEGORI ---
+            with st.expander("🔍 **Filter Kategori**", expanded=True):
+                st.markdown("##### 🏢 Organisasi")
+                for col_name, icon in core_columns:
+                    create_multiselect_filter(col_name, icon, df_cleaned, pending_selection)
+                st.markdown("##### 📍 Posisi & Lokasi")
+                for col_name, icon in detail_columns:
+                    create_multiselect_filter(col_name, icon, df_cleaned, pending_selection)
+                with st.expander("Detail Internal"):
+                    for col_name, icon in internal_columns:
+                        create_multiselect_filter(col_name, icon, df_cleaned, pending_selection)
+
+            col_apply, col_reset = st.columns(2)
+            with col_apply:
+                apply_clicked = st.form_submit_button("✅ Terapkan", type="primary", use_container_width=True)
+            with col_reset:
+                reset_clicked = st.form_submit_button("↩️ Reset", on_click=reset_filters, use_container_width=True)
+
+        if reset_clicked:
+            st.rerun()
+        if apply_clicked:
+            if pending_range is not None and pending_range[0] > pending_range[1]:
+                st.error("❌ Tanggal mulai harus sebelum tanggal akhir")
+                return
+            applied = {'date_range': pending_range, 'selection': pending_selection}
+            # Dashboard hanya dirender ulang bila filter benar-benar berubah
+            if applied != st.session_state['applied_filters']:
+                st.session_state['applied_filters'] = applied
+                st.rerun()
+
+    with st.sidebar:
+        st.markdown("## 🎛️ Filter Dashboard")
+        st.markdown("---")
+        render_filter_panel()
+
+    # --- Terapkan Filter yang Sudah Disubmit ---
+    applied_filters = st.session_state['applied_filters']
+    filter_selection = applied_filters.get('selection', {})
+    date_range = resolve_date_range(applied_filters.get('date_range'), date_bounds)
+
+    with span('filter') as s:
+        df_filtered = DataView(df_cleaned, filter_index.rows(filter_selection, date_range))
+        s.rows = len(df_filtered)
+
     # ========================================
     # TAB: Peta Lokasi Karyawan
     # ========================================
-    with tab_map:
-        if 'Lokasi Kerja' in df_filtered.columns or 'Sub Unit Kerja' in df_filtered.columns:
-            location_col = 'Lokasi Kerja' if 'Lokasi Kerja' in df_filtered.columns else 'Sub Unit Kerja'
-            Jenis_col = 'Jenis' if 'Jenis' in df_filtered.columns else None
-
-            # --- Agregasi Data untuk Peta (Lebih Efisien) ---
-            lokasi_counts = df_filtered[location_col].value_counts().reset_index()
-            lokasi_counts.columns = [location_col, 'Jumlah Karyawan']
-
-            # Pre-calculate counts for 'Laut' and 'Darat'
-            if Jenis_col:
-                jenis_agg = df_filtered.groupby(location_col)[Jenis_col].apply(
-                    lambda x: pd.Series({
-                        'Laut': x.str.contains('Laut', case=False, na=False).sum(),
-                        'Darat': x.str.contains('Darat', case=False, na=False).sum()
-                    })
-                ).unstack(fill_value=0)
-                lokasi_counts = pd.merge(lokasi_counts, jenis_agg, on=location_col, how='left')
-                lokasi_counts[['Laut', 'Darat']] = lokasi_counts[['Laut', 'Darat']].fillna(0).astype(int)
+    @st.fragment
+    def render_map_tab(aggregates):
+        if aggregates.location_col is not None:
+            location_col = aggregates.location_col
+            lokasi_counts = aggregates.lokasi_counts
 
             st.subheader(f"📊 Sebaran Karyawan berdasarkan {location_col}")
             col_stat1, col_stat2, col_stat3 = st.columns(3)
@@ -446,123 +533,51 @@ try:
             with col_stat3:
                 st.metric("Jumlah di Lokasi Tersebut", lokasi_counts.iloc[0]['Jumlah Karyawan'] if not lokasi_counts.empty else 0)
 
-            # --- Fungsi Helper untuk Peta ---
-            def create_map_popup_html(name, jumlah, laut, darat):
-                return f"""
-                <div style="font-family: 'Segoe UI', sans-serif; min-width: 280px; padding: 10px; background: #fff; border-radius: 10px; box-shadow: 0 2px 5px rgba(0,0,0,0.2);">
-                    <h4 style="margin: 0 0 10px 0; color: #2a5298; border-bottom: 2px solid #667eea; padding-bottom: 5px;">📍 {name}</h4>
-                    <div style="font-size: 14px;">
-                        <p style="margin: 5px 0;"><strong>👥 Total Karyawan:</strong> <span style="float: right; font-weight: bold;">{jumlah}</span></p>
-                        <p style="margin: 5px 0;"><strong>🚢 Penempatan Laut:</strong> <span style="float: right; font-weight: bold;">{laut}</span></p>
-                        <p style="margin: 5px 0;"><strong>🏢 Penempatan Darat:</strong> <span style="float: right; font-weight: bold;">{darat}</span></p>
-                    </div>
-                </div>
-                """
-
-            def get_marker_style(count):
-                if count > 50: return 'red', 'star'
-                if count > 20: return 'orange', 'info-sign'
-                if count > 0: return 'blue', 'user'
-                return 'gray', 'map-marker'
-
             # --- Render Peta ---
-            m = folium.Map(
-                location=[-2.5, 118.0], 
-                zoom_start=5, 
-                tiles='OpenStreetMap'
-            )
-                    
+            map_html = None
             with st.spinner("Memuat data peta..."):
                 try:
-                    response = requests.get(GEOJSON_URL, timeout=10)
-                    geojson_data = response.json()
-
-                    # Buat dictionary lookup untuk data karyawan
-                    lokasi_data = lokasi_counts.set_index(location_col).to_dict('index')
-
-                    for feature in geojson_data.get('features', []):
-                        props = feature.get('properties', {})
-                        name = props.get('Nama Pelabuhan', 'Unknown')
-                        data = lokasi_data.get(name)
-
-                        if data and 'geometry' in feature and feature['geometry']['type'] == 'Point':
-                            coords = feature['geometry']['coordinates']
-                            jumlah = data.get('Jumlah Karyawan', 0)
-                            laut = data.get('Laut', 0)
-                            darat = data.get('Darat', 0)
-
-                            if jumlah > 0:
-                                color, icon = get_marker_style(jumlah)
-                                popup_html = create_map_popup_html(name, jumlah, laut, darat)
-                                
-                                folium.Marker(
-                                    location=[coords[1], coords[0]],
-                                    popup=folium.Popup(popup_html, max_width=300),
-                                    tooltip=f"{name} ({jumlah} karyawan)",
-                                    icon=folium.Icon(color=color, icon=icon, prefix='glyphicon')
-                                ).add_to(m)
-
-                except requests.exceptions.RequestException as e:
-                    st.error(f"❌ Error saat mengunduh GeoJSON: {str(e)}")
+                    port_index = load_port_index()
+                    markers = map_markers(lokasi_counts, location_col, port_index)
+                    map_html = render_map_html(markers, port_index)
+
+                except OSError as e:
+                    st.error(f"❌ Error saat memuat GeoJSON: {str(e)}")
                 except Exception as e:
                     st.error(f"❌ Error saat memproses GeoJSON: {str(e)}")
-            
-            st_folium(m, width=None, height=600, returned_objects=[])
+
+            if map_html is not None:
+                st.iframe(map_html, height=600)
                     
                     
     # ========================================
     # TAB: DASHBOARD ANALISIS
     # ========================================
-    with tab_analysis:    
+    @st.fragment
+    def render_analysis_tab(df_filtered, aggregates, state_key):
         if df_filtered.empty:
             st.error("❌ Data kosong! Silakan sesuaikan filter Anda.")
-            st.stop()
+            return
         
+        import altair as alt
+        import plotly.express as px
+
         # =================================================================
         # UTAMA: Filter dashboard ini HANYA untuk karyawan aktif
         # =================================================================
-        df_analysis = filter_active_only(df_filtered.copy())
+        df_analysis = DataView(df_cleaned, aggregates.active_rows)
 
         if df_analysis.empty:
             st.warning("Tidak ada karyawan aktif yang cocok dengan filter yang Anda pilih.")
-            st.stop()
-        
-        # --- 1. PERHITUNGAN KPI ---
-        total_karyawan = len(df_analysis)
-        penempatan_laut = 0
-        penempatan_darat = 0
-        avg_masa_kerja = 0
-        
-        # Hitung penempatan
-        if 'Jenis' in df_analysis.columns:
-            penempatan_laut = df_analysis[
-                df_analysis['Jenis'].str.contains('Laut', case=False, na=False)
-            ].shape[0]
-            penempatan_darat = total_karyawan - penempatan_laut
-
-        # Hitung masa kerja
-        if 'Tanggal Masuk' in df_analysis.columns and not df_analysis['Tanggal Masuk'].isnull().all():
-            df_analysis['Masa Kerja'] = (today - df_analysis['Tanggal Masuk']).dt.days / 365.25
-            avg_masa_kerja = df_analysis['Masa Kerja'].mean()
-
-        # Hitung perubahan vs periode lalu
-        last_month_end = (pd.Timestamp.now().to_period('M').to_timestamp() - pd.Timedelta(days=1))
-        df_last_month_active = filter_active_only(df_cleaned, today=last_month_end)
-        previous_period_total_employees = len(df_last_month_active)
-        current_period_total_employees = total_karyawan
+            return
         
-        # Jika tidak ada data bulan lalu, gunakan nilai default
-        if previous_period_total_employees == 0:
-            previous_period_total_employees = 1  # Hindari pembagian dengan nol
-
-        # Hitung persentase perubahan
-        if previous_period_total_employees > 0:
-            percentage_change = ((current_period_total_employees - previous_period_total_employees) / previous_period_total_employees) * 100
-            delta_text = f"{'+' if percentage_change >= 0 else ''}{percentage_change:.1f}% vs periode lalu"
-            delta_color_hex = "#4ade80" if percentage_change >= 0 else "#e74c3c"
-        else:
-            delta_text = "N/A"
-            delta_color_hex = "rgba(255, 255, 255, 0.7)"
+        facets = aggregates.facets
+
+        # --- 1. KPI (dihitung di engine; perubahan vs headcount akhir bulan lalu) ---
+        kpis = aggregates.kpis(has_placement='Jenis' in df_analysis.columns)
+        percentage_change = kpis.percentage_change
+        delta_text = f"{'+' if percentage_change >= 0 else ''}{percentage_change:.1f}% vs periode lalu"
+        delta_color_hex = "#4ade80" if percentage_change >= 0 else "#e74c3c"
 
         # --- 2. RENDER KPI CARDS ---
         def render_metric_card(label, value, delta_text="", delta_color="#4ade80", icon=""):
@@ -578,15 +593,29 @@ try:
 
         col1, col2, col3, col4= st.columns(4)
         with col1:
-            render_metric_card("Total Karyawan Aktif", f"{total_karyawan:,}", delta_text, delta_color_hex, "📊")
+            render_metric_card("Total Karyawan Aktif", f"{kpis.total:,}", delta_text, delta_color_hex, "📊")
         with col2:
-            pct_laut = (penempatan_laut / total_karyawan * 100) if total_karyawan > 0 else 0
-            render_metric_card("Penempatan Laut", f"{penempatan_laut:,}", f"{pct_laut:.1f}% dari total", icon="⚓")
+            render_metric_card("Penempatan Laut", f"{kpis.laut:,}", f"{kpis.share(kpis.laut):.1f}% dari total", icon="⚓")
         with col3:
-            pct_darat = (penempatan_darat / total_karyawan * 100) if total_karyawan > 0 else 0
-            render_metric_card("Penempatan Darat", f"{penempatan_darat:,}", f"{pct_darat:.1f}% dari total", icon="🏢")
+            render_metric_card("Penempatan Darat", f"{kpis.darat:,}", f"{kpis.share(kpis.darat):.1f}% dari total", icon="🏢")
         with col4:
-            render_metric_card("Rata-rata Masa Kerja", f"{avg_masa_kerja:.1f} Tahun", "Tahun", "#a29bfe", "📅")
+            render_metric_card("Rata-rata Masa Kerja", f"{kpis.avg_masa_kerja:.1f} Tahun", "Tahun", "#a29bfe", "📅")
+
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        # --- 3. TREN KARYAWAN AKTIF ---
+        st.markdown('<div class="section-header"><h3>📈 Tren Karyawan Aktif per Bulan</h3></div>', unsafe_allow_html=True)
+        def build_trend(trend_df):
+            return alt.Chart(trend_df).mark_area(
+                line={'color': '#667eea'},
+                color='#667eea',
+                opacity=0.3
+            ).encode(
+                x=alt.X('Bulan:T', title=None),
+                y=alt.Y('Jumlah:Q', title='Jumlah Karyawan'),
+                tooltip=[alt.Tooltip('Bulan:T', format='%b %Y'), alt.Tooltip('Jumlah:Q', format=',')]
+            ).properties(height=300)
+        render_altair('trend', aggregates.trend.reset_index(), build_trend)
 
         st.markdown("<br>", unsafe_allow_html=True)
         
@@ -597,36 +626,8 @@ try:
             st.markdown('<div class="section-header"><h3>👨‍👩‍👧‍👦 Distribusi Generasi</h3></div>', unsafe_allow_html=True)
     
             if 'Tanggal Lahir' in df_analysis.columns:
-                current_year = datetime.now().year
-    
-                def classify_generation(dob):
-                    if pd.isnull(dob):
-                        return 'Unknown'
-                    age = current_year - dob.year
-                    if age >= 60:
-                        return 'Boomers'
-                    elif 44 <= age <= 59:
-                        return 'Gen X'
-                    elif 28 <= age <= 43:
-                        return 'Millenials'
-                    elif age <= 27:
-                        return 'Gen Z'
-                    else:
-                        return 'Unknown'
-    
-                df_analysis['Generasi'] = df_analysis['Tanggal Lahir'].apply(classify_generation)
-    
-                # Filter out Unknown 
-                generasi_df = df_analysis[df_analysis['Generasi'] != 'Unknown']['Generasi'].value_counts().reset_index()
-                generasi_df.columns = ['Generasi', 'Jumlah']
-                
-                # Calculate total and percentage
-                generasi_df['Persentase'] = (generasi_df['Jumlah'] / len(df_analysis) * 100).round(1)
-                
-                # Sort by a specific order
-                order = ['Boomers', 'Gen X', 'Millenials', 'Gen Z'] # Urutan kronologis
-                generasi_df['Generasi'] = pd.Categorical(generasi_df['Generasi'], categories=order, ordered=True) # Terapkan urutan
-                generasi_df = generasi_df.sort_values('Generasi')
+                # Tanpa Unknown, urut kronologis
+                generasi_df = generation_table(facets)
                 
                 emoji_map = {
                     'Millenials': '👨‍💻',
@@ -651,7 +652,7 @@ try:
             st.markdown('<div class="section-header"><h3>👨‍🦱👩‍🦰 Jenis Kelamin</h3></div>', unsafe_allow_html=True)
             if 'Jenis Kelamin' in df_analysis.columns:
                 # Hitung distribusi
-                gender_counts = df_analysis['Jenis Kelamin'].value_counts()
+                gender_counts = facets.counts('Jenis Kelamin')
                 total = gender_counts.sum()
                 laki = 0
                 perempuan = 0
@@ -663,34 +664,36 @@ try:
                 gender_df = gender_counts.reset_index()
                 gender_df.columns = ['Jenis Kelamin', 'Jumlah']
 
-                fig_pie = px.pie(
-                    gender_df,
-                    values='Jumlah',
-                    names='Jenis Kelamin',
-                    hole=0.35,
-                    height=400,
-                    color='Jenis Kelamin',
-                    color_discrete_map={
-                        'Laki-laki': '#1e3c72',
-                        'Perempuan': '#f75196'
-                    }
-                )
-                fig_pie.update_traces(
-                    textposition='inside',
-                    textinfo='percent+label',
-                    pull=[0.05, 0]
-                )
-                fig_pie.update_layout(
-                    showlegend=True,
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=-0.2,
-                        xanchor="center",
-                        x=0.5
+                def build_gender_pie(gender_df):
+                    fig_pie = px.pie(
+                        gender_df,
+                        values='Jumlah',
+                        names='Jenis Kelamin',
+                        hole=0.35,
+                        height=400,
+                        color='Jenis Kelamin',
+                        color_discrete_map={
+                            'Laki-laki': '#1e3c72',
+                            'Perempuan': '#f75196'
+                        }
+                    )
+                    fig_pie.update_traces(
+                        textposition='inside',
+                        textinfo='percent+label',
+                        pull=[0.05, 0]
+                    )
+                    fig_pie.update_layout(
+                        showlegend=True,
+                        legend=dict(
+                            orientation="h",
+                            yanchor="bottom",
+                            y=-0.2,
+                            xanchor="center",
+                            x=0.5
+                        )
                     )
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
+                    return fig_pie
+                render_plotly('gender_pie', gender_df, build_gender_pie)
             else:
                 st.info("Tidak ada data jenis kelamin untuk ditampilkan.")
                 
@@ -728,49 +731,50 @@ try:
             if 'Status Kepegawaian' in df_analysis.columns:
                 st.markdown('<div class="section-header"><h3>👨‍💼 Distribusi Status Karyawan</h3></div>', unsafe_allow_html=True)
                 
-                keaktifan_df = df_analysis['Status Kepegawaian'].value_counts().reset_index()
+                keaktifan_df = facets.counts('Status Kepegawaian').reset_index()
                 keaktifan_df.columns = ['Status Aktif', 'Jumlah']
                 
-                fig_pie = px.pie(
-                    keaktifan_df,
-                    values='Jumlah',
-                    names='Status Aktif',
-                    hole=0.35,
-                    height=400,
-                    color='Status Aktif',
-                    color_discrete_map={
-                        'PKWTT': "#9d00fffb",
-                        'PKWT': '#00d2ff',
-                        'Cuti': "#fffb00",
-                        'Resign': '#e74c3c',
-                        'Pensiun': '#95a5a6',
-                        'Terminated': '#c0392b'
-                    }
-                )
-                
-                fig_pie.update_traces(
-                    textposition='inside',
-                    textinfo='percent+label',
-                    pull=[0.05, 0]
-                )
-                
-                fig_pie.update_layout(
-                    showlegend=True,
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=-0.2,
-                        xanchor="center",
-                        x=0.5
+                def build_status_pie(keaktifan_df):
+                    fig_pie = px.pie(
+                        keaktifan_df,
+                        values='Jumlah',
+                        names='Status Aktif',
+                        hole=0.35,
+                        height=400,
+                        color='Status Aktif',
+                        color_discrete_map={
+                            'PKWTT': "#9d00fffb",
+                            'PKWT': '#00d2ff',
+                            'Cuti': "#fffb00",
+                            'Resign': '#e74c3c',
+                            'Pensiun': '#95a5a6',
+                            'Terminated': '#c0392b'
+                        }
                     )
-                )
-                
-                st.plotly_chart(fig_pie, use_container_width=True)
+
+                    fig_pie.update_traces(
+                        textposition='inside',
+                        textinfo='percent+label',
+                        pull=[0.05, 0]
+                    )
+
+                    fig_pie.update_layout(
+                        showlegend=True,
+                        legend=dict(
+                            orientation="h",
+                            yanchor="bottom",
+                            y=-0.2,
+                            xanchor="center",
+                            x=0.5
+                        )
+                    )
+                    return fig_pie
+
+                render_plotly('status_pie', keaktifan_df, build_status_pie)
                 
                 col_num3, col_num4 = st.columns(2)
                 with col_num3:
-                    pkwtt_count = keaktifan_df.loc[keaktifan_df['Status Aktif'] == 'PKWTT', 'Jumlah'].values
-                    pkwtt_count = pkwtt_count[0] if len(pkwtt_count) > 0 else 0
+                    pkwtt_count = int(facets.counts('Status Kepegawaian').get('PKWTT', 0))
                     st.markdown(f"""
                     <div style="
                         background: linear-gradient(135deg, #9d00fffb 0%, #6a00ff 100%);
@@ -786,8 +790,7 @@ try:
                     """, unsafe_allow_html=True)
                     
                 with col_num4:
-                    pkwt_count = keaktifan_df.loc[keaktifan_df['Status Aktif'] == 'PKWT', 'Jumlah'].values
-                    pkwt_count = pkwt_count[0] if len(pkwt_count) > 0 else 0
+                    pkwt_count = int(facets.counts('Status Kepegawaian').get('PKWT', 0))
                     st.markdown(f"""
                     <div style="
                         background: linear-gradient(135deg, #00d2ff 0%, #0066ff 100%);
@@ -811,84 +814,75 @@ try:
                 
                 st.markdown('<div style="margin-top: 20px;"></div>', unsafe_allow_html=True)
                 if 'Band Level' in df_analysis.columns:
-                    level_df = df_analysis['Band Level'].value_counts().reset_index()
+                    # Band di luar 12 teratas digabung ke "Lainnya"
+                    level_df = top_n_rollup(facets.counts('Band Level')).reset_index()
                     level_df.columns = ['Band Level', 'Jumlah']
-                    
-                    chart_band = alt.Chart(level_df).mark_bar(
-                        cornerRadiusTopLeft=10,
-                        cornerRadiusTopRight=10
-                    ).encode(
-                        x=alt.X('Band Level:N', title='Klasifikasi Jabatan', axis=alt.Axis(labelAngle=-45)),
-                        y=alt.Y('Jumlah:Q', title='Jumlah Karyawan'),
-                        color=alt.Color('Band Level:N', scale=alt.Scale(scheme='blues'), legend=None),
-                        tooltip=['Band Level', 'Jumlah']
-                    ).properties(height=400)
-                    
-                    text = chart_band.mark_text(
-                        dy=-10,
-                        color='white',
-                        fontSize=14,
-                        fontWeight='bold'
-                    ).encode(
-                        text='Jumlah:Q'
-                    )
-                    
-                    st.altair_chart(chart_band + text, use_container_width=True)
+
+                    def build_band(level_df):
+                        chart_band = alt.Chart(level_df).mark_bar(
+                            cornerRadiusTopLeft=10,
+                            cornerRadiusTopRight=10
+                        ).encode(
+                            x=alt.X('Band Level:N', title='Klasifikasi Jabatan', axis=alt.Axis(labelAngle=-45)),
+                            y=alt.Y('Jumlah:Q', title='Jumlah Karyawan'),
+                            color=alt.Color('Band Level:N', scale=alt.Scale(scheme='blues'), legend=None),
+                            tooltip=['Band Level', 'Jumlah']
+                        ).properties(height=400)
+
+                        text = chart_band.mark_text(
+                            dy=-10,
+                            color='white',
+                            fontSize=14,
+                            fontWeight='bold'
+                        ).encode(
+                            text='Jumlah:Q'
+                        )
+                        return chart_band + text
+
+                    render_altair('band_level', level_df, build_band)
                 else:
                     st.info("Kolom 'Klasifikasi Band Level' tidak ditemukan.")
             
             with col_vis2:
                 st.markdown('<div class="section-header"><h3> Kantor Pusat Vs Cabang</h3></div>', unsafe_allow_html=True)
                 if 'Unit Kerja' in df_analysis.columns:
-                    kantor_df = df_analysis['Unit Kerja'].value_counts().reset_index()
-                    kantor_df.columns = ['Unit Kerja', 'Jumlah']
-                    
-                    # Fungsi untuk mengklasifikasikan tipe kantor dengan lebih baik
-                    def classify_office_type(unit_kerja):
-                        unit_kerja_upper = str(unit_kerja).upper()
-                        if 'HO' in unit_kerja_upper:
-                            return 'Kantor Pusat'
-                        elif 'REGIONAL' in unit_kerja_upper:
-                            return 'Regional'
-                        else:
-                            return 'Kantor Cabang'
-                    
-                    kantor_df['Tipe Kantor'] = kantor_df['Unit Kerja'].apply(classify_office_type)
-                    
-                    kantor_summary = kantor_df.groupby('Tipe Kantor')['Jumlah'].sum().reset_index()
-                    
-                    fig_pie = px.pie(
-                        kantor_summary,
-                        values='Jumlah',
-                        names='Tipe Kantor',
-                        color='Tipe Kantor',
-                        color_discrete_map={
-                            'Kantor Pusat': "#0d47a1",  # Biru paling gelap
-                            'Regional': '#42a5f5',      # Biru tengah
-                            'Kantor Cabang': '#bbdefb', # Biru paling terang
-                        },
-                        hole=0.4,
-                        height=400
-                    )
-                    
-                    fig_pie.update_traces(
-                        textposition='inside',
-                        textinfo='percent+label',
-                        textfont_size=14
-                    )
+                    # Pusat / Regional / Cabang dari hitungan per Unit Kerja
+                    kantor_summary = office_type_counts(facets.counts('Unit Kerja'))
                     
-                    fig_pie.update_layout(
-                        showlegend=True,
-                        legend=dict(
-                            orientation="h",
-                            yanchor="bottom",
-                            y=-0.2,
-                            xanchor="center",
-                            x=0.5
+                    def build_office_pie(kantor_summary):
+                        fig_pie = px.pie(
+                            kantor_summary,
+                            values='Jumlah',
+                            names='Tipe Kantor',
+                            color='Tipe Kantor',
+                            color_discrete_map={
+                                'Kantor Pusat': "#0d47a1",  # Biru paling gelap
+                                'Regional': '#42a5f5',      # Biru tengah
+                                'Kantor Cabang': '#bbdefb', # Biru paling terang
+                            },
+                            hole=0.4,
+                            height=400
                         )
-                    )
-                    
-                    st.plotly_chart(fig_pie, use_container_width=True)
+
+                        fig_pie.update_traces(
+                            textposition='inside',
+                            textinfo='percent+label',
+                            textfont_size=14
+                        )
+
+                        fig_pie.update_layout(
+                            showlegend=True,
+                            legend=dict(
+                                orientation="h",
+                                yanchor="bottom",
+                                y=-0.2,
+                                xanchor="center",
+                                x=0.5
+                            )
+                        )
+                        return fig_pie
+
+                    render_plotly('office_pie', kantor_summary, build_office_pie)
                     
             #ROW 3: DISTRIBUSI KARYAWAN AKTIF
             st.markdown('<div class="section-header"><h3>📊 Analisis Detail per Lokasi Penempatan</h3></div>', unsafe_allow_html=True)
@@ -914,48 +908,49 @@ try:
                     </div>
                     """, unsafe_allow_html=True)
                 
-                def create_breakdown_barchart(df, column_name, title, color_range):
+                def create_breakdown_barchart(counts, column_name, title, color_range):
                     """Membuat grafik batang"""
-                    if column_name not in df.columns or df.empty:
+                    if counts.empty:
                         st.info(f"Kolom '{column_name}' tidak tersedia.")
                         return
 
-                    data = df[column_name].value_counts().nlargest(7).reset_index()
+                    data = counts.nlargest(7).reset_index()
                     data.columns = [column_name, 'Jumlah']
 
-                    chart = alt.Chart(data).mark_bar(
-                        cornerRadius=5,
-                        height=25
-                    ).encode(
-                        x=alt.X('Jumlah:Q', title=None, axis=None),
-                        y=alt.Y(f'{column_name}:N', sort='-x', title=None, axis=alt.Axis(labelPadding=10), scale=alt.Scale(paddingInner=1)),
-                        color=alt.Color('Jumlah:Q', scale=alt.Scale(range=color_range), legend=None),
-                        tooltip=[alt.Tooltip(column_name, title=column_name), alt.Tooltip('Jumlah', title='Jumlah')]
-                    ).properties(
-                        title=alt.TitleParams(text=title, anchor='start', fontSize=20, fontWeight='bold', dy=-10)
-                    )
+                    def build(data):
+                        chart = alt.Chart(data).mark_bar(
+                            cornerRadius=5,
+                            height=25
+                        ).encode(
+                            x=alt.X('Jumlah:Q', title=None, axis=None),
+                            y=alt.Y(f'{column_name}:N', sort='-x', title=None, axis=alt.Axis(labelPadding=10), scale=alt.Scale(paddingInner=1)),
+                            color=alt.Color('Jumlah:Q', scale=alt.Scale(range=color_range), legend=None),
+                            tooltip=[alt.Tooltip(column_name, title=column_name), alt.Tooltip('Jumlah', title='Jumlah')]
+                        ).properties(
+                            title=alt.TitleParams(text=title, anchor='start', fontSize=20, fontWeight='bold', dy=-10)
+                        )
 
-                    text = chart.mark_text(
-                        align='left', baseline='middle', dx=5, color='white', fontWeight='bold'
-                    ).encode(text='Jumlah:Q')
+                        text = chart.mark_text(
+                            align='left', baseline='middle', dx=5, color='white', fontWeight='bold'
+                        ).encode(text='Jumlah:Q')
+                        return chart + text
 
-                    st.altair_chart(chart + text, use_container_width=True)
+                    # Judul dan warna ikut kunci: data yang sama bisa tampil di dua kolom
+                    render_altair(('breakdown', column_name, title, tuple(color_range)), data, build)
 
                 with col_laut:
-                    laut_df = df_analysis[df_analysis['Jenis'].str.contains('Laut', case=False, na=False)]
-                    render_summary_card("Total Karyawan Laut", len(laut_df), "⚓", "linear-gradient(135deg, #1e3c72 0%, #2a5298 100%)")
+                    render_summary_card("Total Karyawan Laut", facets.split_totals['Laut'], "⚓", "linear-gradient(135deg, #1e3c72 0%, #2a5298 100%)")
                     
-                    create_breakdown_barchart(laut_df, 'Klasifikasi Jabatan', 'Breakdown Jabatan', ['#667eea', '#2a5298'])
+                    create_breakdown_barchart(facets.split_counts('Laut', 'Klasifikasi Jabatan'), 'Klasifikasi Jabatan', 'Breakdown Jabatan', ['#667eea', '#2a5298'])
                     st.markdown("---")
-                    create_breakdown_barchart(laut_df, 'Tingkat Pendidikan', 'Tingkat Pendidikan', ['#89f7fe', '#66a6ff'])
+                    create_breakdown_barchart(facets.split_counts('Laut', 'Tingkat Pendidikan'), 'Tingkat Pendidikan', 'Tingkat Pendidikan', ['#89f7fe', '#66a6ff'])
 
                 with col_darat:
-                    darat_df = df_analysis[df_analysis['Jenis'].str.contains('Darat', case=False, na=False)]
-                    render_summary_card("Total Karyawan Darat", len(darat_df), "🏢", "linear-gradient(135deg, #15803d 0%, #22c55e 100%)")
+                    render_summary_card("Total Karyawan Darat", facets.split_totals['Darat'], "🏢", "linear-gradient(135deg, #15803d 0%, #22c55e 100%)")
                     
-                    create_breakdown_barchart(darat_df, 'Klasifikasi Jabatan', 'Breakdown Jabatan', ['#34d399', '#059669'])
+                    create_breakdown_barchart(facets.split_counts('Darat', 'Klasifikasi Jabatan'), 'Klasifikasi Jabatan', 'Breakdown Jabatan', ['#34d399', '#059669'])
                     st.markdown("---")
-                    create_breakdown_barchart(darat_df, 'Tingkat Pendidikan', 'Tingkat Pendidikan', ['#a7f3d0', '#34d399'])
+                    create_breakdown_barchart(facets.split_counts('Darat', 'Tingkat Pendidikan'), 'Tingkat Pendidikan', 'Tingkat Pendidikan', ['#a7f3d0', '#34d399'])
 
             else:
                 st.info("Kolom 'Jenis' tidak ditemukan. Bagian ini tidak akan ditampilkan.")
@@ -967,58 +962,62 @@ try:
             with col_kelas:
                 st.markdown('<div class="section-header"><h3>🚢 Distribusi Kelas Kapal</h3></div>', unsafe_allow_html=True)
                 if 'Kelas Kapal' in df_analysis.columns:
-                    kelas_df = df_analysis['Kelas Kapal'].value_counts().reset_index()
+                    kelas_df = top_n_rollup(facets.counts('Kelas Kapal')).reset_index()
                     kelas_df.columns = ['Kelas Kapal', 'Jumlah']
-                    
-                    chart_kelas = alt.Chart(kelas_df).mark_bar(
-                        cornerRadiusTopLeft=10,
-                        cornerRadiusTopRight=10
-                    ).encode(
-                        x=alt.X('Kelas Kapal:N', title='Kelas Kapal', axis=alt.Axis(labelAngle=-45)),
-                        y=alt.Y('Jumlah:Q', title='Jumlah Karyawan'),
-                        color=alt.Color('Kelas Kapal:N', scale=alt.Scale(scheme='tealblues'), legend=None),
-                        tooltip=['Kelas Kapal', 'Jumlah']
-                    ).properties(height=400)
-                    
-                    text = chart_kelas.mark_text(
-                        dy=-10,
-                        color='white',
-                        fontSize=14,
-                        fontWeight='bold'
-                    ).encode(
-                        text='Jumlah:Q'
-                    )
-                    
-                    st.altair_chart(chart_kelas + text, use_container_width=True)
+
+                    def build_kelas(kelas_df):
+                        chart_kelas = alt.Chart(kelas_df).mark_bar(
+                            cornerRadiusTopLeft=10,
+                            cornerRadiusTopRight=10
+                        ).encode(
+                            x=alt.X('Kelas Kapal:N', title='Kelas Kapal', axis=alt.Axis(labelAngle=-45)),
+                            y=alt.Y('Jumlah:Q', title='Jumlah Karyawan'),
+                            color=alt.Color('Kelas Kapal:N', scale=alt.Scale(scheme='tealblues'), legend=None),
+                            tooltip=['Kelas Kapal', 'Jumlah']
+                        ).properties(height=400)
+
+                        text = chart_kelas.mark_text(
+                            dy=-10,
+                            color='white',
+                            fontSize=14,
+                            fontWeight='bold'
+                        ).encode(
+                            text='Jumlah:Q'
+                        )
+                        return chart_kelas + text
+
+                    render_altair('kelas_kapal', kelas_df, build_kelas)
                 else:
                     st.info("Kolom 'Kelas Kapal' tidak ditemukan.")
                     
             with col_kapal:
                 st.markdown('<div class="section-header"><h3>🚢 Distribusi Tipe Kapal</h3></div>', unsafe_allow_html=True)
                 if 'Segmen' in df_analysis.columns:
-                    tipe_df = df_analysis['Segmen'].value_counts().reset_index()
+                    tipe_df = top_n_rollup(facets.counts('Segmen')).reset_index()
                     tipe_df.columns = ['Segmen', 'Jumlah']
-                    
-                    chart_tipe = alt.Chart(tipe_df).mark_bar(
-                        cornerRadiusTopLeft=10,
-                        cornerRadiusTopRight=10
-                    ).encode(
-                        x=alt.X('Segmen:N', title='Segmen', axis=alt.Axis(labelAngle=-45)),
-                        y=alt.Y('Jumlah:Q', title='Jumlah Karyawan'),
-                        color=alt.Color('Segmen:N', scale=alt.Scale(scheme='reds'), legend=None),
-                        tooltip=['Segmen', 'Jumlah']
-                    ).properties(height=400)
-                    
-                    text = chart_tipe.mark_text(
-                        dy=-10,
-                        color='white',
-                        fontSize=14,
-                        fontWeight='bold'
-                    ).encode(
-                        text='Jumlah:Q'
-                    )
-                    
-                    st.altair_chart(chart_tipe + text, use_container_width=True)
+
+                    def build_tipe(tipe_df):
+                        chart_tipe = alt.Chart(tipe_df).mark_bar(
+                            cornerRadiusTopLeft=10,
+                            cornerRadiusTopRight=10
+                        ).encode(
+                            x=alt.X('Segmen:N', title='Segmen', axis=alt.Axis(labelAngle=-45)),
+                            y=alt.Y('Jumlah:Q', title='Jumlah Karyawan'),
+                            color=alt.Color('Segmen:N', scale=alt.Scale(scheme='reds'), legend=None),
+                            tooltip=['Segmen', 'Jumlah']
+                        ).properties(height=400)
+
+                        text = chart_tipe.mark_text(
+                            dy=-10,
+                            color='white',
+                            fontSize=14,
+                            fontWeight='bold'
+                        ).encode(
+                            text='Jumlah:Q'
+                        )
+                        return chart_tipe + text
+
+                    render_altair('segmen', tipe_df, build_tipe)
                 else:
                     st.info("Kolom 'Segmen' tidak ditemukan.")
                     
@@ -1028,15 +1027,15 @@ try:
             with col_pensiun1:
                 st.markdown('<div class="section-header"><h3>⚠️ Karyawan Pensiun</h3></div>', unsafe_allow_html=True)
                 
-                # Filter karyawan yang pensiun dari data yang sudah difilter sidebar
-                pensiun_df = df_filtered[df_filtered['Status Kepegawaian'] == 'PENSIUN']
+                # Karyawan pensiun dari data yang sudah difilter sidebar, per penempatan
+                pensiun_counts = aggregates.placement_counts('PENSIUN')
                 
                 # Buat dua kolom di dalam kolom pensiun
                 col_pensiun_laut, col_pensiun_darat = st.columns(2)
 
-                if 'Jenis' in pensiun_df.columns:
-                    pensiun_laut_count = pensiun_df[pensiun_df['Jenis'].str.contains('Laut', na=False)].shape[0]
-                    pensiun_darat_count = pensiun_df[pensiun_df['Jenis'].str.contains('Darat', na=False)].shape[0]
+                if 'Jenis' in df_filtered.columns:
+                    pensiun_laut_count = pensiun_counts['Laut']
+                    pensiun_darat_count = pensiun_counts['Darat']
 
                     with col_pensiun_laut:
                         render_summary_card("Pensiun Laut", pensiun_laut_count, "⚓", "linear-gradient(135deg, #1e3c72 0%, #2a5298 100%)")
@@ -1048,15 +1047,15 @@ try:
             with col_resign1:
                 st.markdown('<div class="section-header"><h3>👋 Karyawan Resign</h3></div>', unsafe_allow_html=True)
 
-                # Filter karyawan yang resign
-                resign_df = df_filtered[df_filtered['Status Kepegawaian'] == 'RESIGN']
+                # Karyawan resign per penempatan
+                resign_counts = aggregates.placement_counts('RESIGN')
 
                 # Buat dua kolom di dalam kolom resign
                 col_resign_laut, col_resign_darat = st.columns(2)
 
-                if 'Jenis' in resign_df.columns:
-                    resign_laut_count = resign_df[resign_df['Jenis'].str.contains('Laut', na=False)].shape[0]
-                    resign_darat_count = resign_df[resign_df['Jenis'].str.contains('Darat', na=False)].shape[0]
+                if 'Jenis' in df_filtered.columns:
+                    resign_laut_count = resign_counts['Laut']
+                    resign_darat_count = resign_counts['Darat']
 
                     with col_resign_laut:
                         render_summary_card("Resign Laut", resign_laut_count, "⚓", "linear-gradient(135deg, #1e3c72 0%, #2a5298 100%)")
@@ -1069,17 +1068,8 @@ try:
             
             with col_pensiun:
                 st.markdown('<div class="section-header"><h3>🎯 Karyawan Mendekati Pensiun (Dalam 12 Bulan)</h3></div>', unsafe_allow_html=True)
-                if 'Tanggal Lahir' in df_filtered.columns:
-                    df_filtered['Usia'] = df_filtered['Tanggal Lahir'].apply(
-                        lambda dob: (today.year - dob.year) - ((today.month, today.day) < (dob.month, dob.day)) if pd.notnull(dob) else None
-                    )
-                    df_filtered['Bulan Menuju Pensiun'] = df_filtered['Tanggal Lahir'].apply(
-                        lambda dob: ((dob.replace(year=dob.year + 60) - today).days // 30) if pd.notnull(dob) else None
-                    )
-                    nearing_pension_df = df_filtered[
-                        (df_filtered['Bulan Menuju Pensiun'] >= 0) & 
-                        (df_filtered['Bulan Menuju Pensiun'] <= 12)
-                    ]
+                if aggregates.pension_rows is not None:
+                    nearing_pension_df = DataView(df_cleaned, aggregates.pension_rows)
                     
                     if not nearing_pension_df.empty:
                         st.dataframe(
@@ -1093,14 +1083,8 @@ try:
                     
             with col_resign:
                 st.markdown('<div class="section-header"><h3>❗ Karyawan Mendekati Resign (Dalam 1 Bulan)</h3></div>', unsafe_allow_html=True)
-                if 'Tanggal Resign' in df_filtered.columns:
-                    df_filtered['Bulan Menuju Resign'] = df_filtered['Tanggal Resign'].apply(
-                        lambda dor: ((dor - today).days // 30) if pd.notnull(dor) else None
-                    )
-                    nearing_resign_df = df_filtered[
-                        (df_filtered['Bulan Menuju Resign'] >= 0) & 
-                        (df_filtered['Bulan Menuju Resign'] <= 1)
-                    ]
+                if aggregates.resign_rows is not None:
+                    nearing_resign_df = DataView(df_cleaned, aggregates.resign_rows)
                     
                     if not nearing_resign_df.empty:
                         st.dataframe(
@@ -1115,30 +1099,44 @@ try:
         # ===============================
         st.header("📑 Tabel Data Hasil Filter")
         st.info("Tabel di bawah ini menampilkan karyawan yang aktif berdasarkan filter yang dipilih.")
-        st.dataframe(
-            df_analysis,
-            use_container_width=True,
-            height=400
-        )
+        render_data_grid(df_analysis, key="analysis", height=400)
         
         st.caption(f"Menampilkan {len(df_analysis):,} karyawan aktif dari total {len(df_cleaned):,} data.")
         
         # Download
-        col_dl1, col_dl2, col_dl3 = st.columns([1, 1, 2])
-        
-        with col_dl1:
-            csv_filtered = to_csv(df_analysis)
-            st.download_button(
-                label="💾 Download CSV",
-                data=csv_filtered,
-                file_name=f"filtered_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+        render_export(
+            df_analysis, f"filtered_{df_cleaned.attrs.get('version')}_{state_key[:16]}_{today:%Y%m%d}",
+            "filtered_data", "💾 Download"
+        )
+
+    # ========================================
+    # RENDER TAB AKTIF
+    # ========================================
+    # Agregat hanya dihitung bila tab peta/analisis dibuka (dan di-cache lintas sesi)
+    state_key = filter_state_key(filter_selection, date_range)
+    if tab_analysis.open or tab_map.open:
+        aggregates = get_aggregates(df_filtered, df_cleaned, state_key, today)
+    if tab_analysis.open:
+        with tab_analysis:
+            render_analysis_tab(df_filtered, aggregates, state_key)
+    if tab_map.open:
+        with tab_map:
+            render_map_tab(aggregates)
+    if tab_raw_data.open:
+        with tab_raw_data:
+            render_raw_tab(df_cleaned, today)
+
+    if perf_panel_allowed():
+        render_perf_panel()
 
 except Exception as e:
     st.error(f"❗ Terjadi kesalahan saat memproses data:")
     st.exception(e)
     st.info("💡 Tips: Pastikan koneksi internet Anda stabil dan URL Google Sheet serta file `secrets.toml` sudah benar.")
 
+finally:
+    # Dicatat juga saat run dihentikan st.rerun()
+    METRICS.observe('page.run', time.perf_counter() - run_started)
+    METRICS.write_prometheus()
+
 
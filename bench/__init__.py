@@ -0,0 +1 @@
+"""Benchmark pipeline dashboard dengan data karyawan sintetis (tanpa Streamlit)."""
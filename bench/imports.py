@@ -0,0 +1,107 @@
+"""Anggaran waktu import untuk cold start app.py.
+
+Modul yang diimport app.py di tingkat modul (dibaca dari AST-nya) diukur
+sekaligus di interpreter baru dengan `python -X importtime`, lalu
+dibandingkan dengan `STARTUP_BUDGET_MS`. Library berat yang seharusnya
+lazy (chart, peta, konektor Sheets) diukur terpisah sebagai pembanding,
+dan dipastikan tidak ikut termuat saat startup.
+
+    python -m bench.imports                 # gagal bila melewati anggaran
+    python -m bench.imports --budget 1200 --repeat 5
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, 'app.py')
+
+STARTUP_BUDGET_MS = 1500
+DEFAULT_REPEAT = 3
+
+# Hanya boleh diimport saat bagian yang memakainya dirender
+# (pyarrow, plotly dasar, dan streamlit.components.v1 sudah dimuat streamlit sendiri)
+LAZY_MODULES = ['plotly.express', 'altair', 'folium', 'streamlit_gsheets', 'requests']
+
+
+def startup_modules(path=APP_PATH):
+    """Modul yang diimport app.py di tingkat modul, sesuai urutan."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_profile(modules):
+    """(total ms, {modul: ms kumulatif}) untuk import `modules` di proses baru."""
+    code = '; '.join(f'import {name}' for name in modules)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, cwd=ROOT, check=True
+    )
+    loaded = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        loaded[name.strip()] = int(cumulative) / 1000
+        # Baris tanpa indentasi adalah import tingkat atas (kumulatif penuh)
+        if not line.split('|')[-1].startswith('  '):
+            total_us += int(cumulative)
+    return total_us / 1000, loaded
+
+
+def measure(modules, repeat=DEFAULT_REPEAT):
+    """Median total waktu import dan profil run terakhir."""
+    totals = []
+    loaded = {}
+    for _ in range(repeat):
+        total, loaded = import_profile(modules)
+        totals.append(total)
+    return statistics.median(totals), loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget', type=float, default=STARTUP_BUDGET_MS, help="anggaran startup (ms)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args(argv)
+
+    modules = startup_modules()
+    startup_ms, loaded = measure(modules, args.repeat)
+    print(f"{'modul':<36} {'kumulatif (ms)':>15}")
+    for name in modules:
+        print(f"{name:<36} {loaded.get(name, 0.0):>15.1f}")
+    print(f"{'TOTAL startup app.py':<36} {startup_ms:>15.1f}  (anggaran {args.budget:.0f} ms)")
+
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    print()
+    print(f"{'modul lazy':<36} {'tambahan (ms)':>15}")
+    for name in LAZY_MODULES:
+        if name in eager:
+            print(f"{name:<36} {'-':>15}  TERMUAT SAAT STARTUP")
+            continue
+        extra, _ = measure(modules + [name], args.repeat)
+        print(f"{name:<36} {max(extra - startup_ms, 0.0):>15.1f}")
+
+    failed = False
+    if startup_ms > args.budget:
+        print(f"\nMELEBIHI ANGGARAN: {startup_ms:.0f} ms > {args.budget:.0f} ms")
+        failed = True
+    if eager:
+        print(f"\nModul lazy ikut termuat saat startup: {', '.join(eager)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
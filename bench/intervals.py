@@ -0,0 +1,87 @@
+"""Cek konsistensi `ActiveIntervalIndex` (tanpa Streamlit).
+
+Query periode harus sama dengan gabungan query titik untuk setiap hari di
+periode itu, dan baris dengan interval kosong (keluar sebelum masuk)
+tidak pernah terhitung aktif, baik per tanggal maupun per periode.
+
+    python -m bench.intervals               # gagal bila ada cek yang gagal
+    python -m bench.intervals --rows 50k
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bench.run import parse_size
+from bench.synthetic import REFERENCE_DATE, generate_raw
+from engine.active import ActiveIntervalIndex, filter_active_only
+from engine.sync import clean_rows
+
+# Periode uji: satu bulan penuh dan satu hari
+PERIODS = [
+    (pd.Timestamp('2020-01-01'), pd.Timestamp('2020-01-31')),
+    (pd.Timestamp('2023-06-15'), pd.Timestamp('2023-06-15')),
+]
+
+
+def exit_before_entry_case():
+    """(nama cek, lolos, keterangan) untuk baris yang keluar sebelum masuk."""
+    df = pd.DataFrame({
+        'Tanggal Masuk': pd.to_datetime(['2015-01-01', '2020-01-10']),
+        'Tanggal Keluar': pd.to_datetime([None, '2019-05-01']),
+        'Status Kepegawaian': pd.Categorical(['PKWTT', 'RESIGN']),
+    })
+    index = ActiveIntervalIndex(df, REFERENCE_DATE)
+    at = index.count_at('2020-01-10')
+    during = index.count_during('2020-01-01', '2020-02-01')
+    mask = index.mask_during('2020-01-01', '2020-02-01').tolist()
+    ok = at == 1 and during == 1 and mask == [True, False]
+    return 'keluar sebelum masuk tidak pernah aktif', ok, f"count_at={at} count_during={during} mask={mask}"
+
+
+def run_checks(n_rows, seed=0):
+    """Daftar (nama cek, lolos, keterangan)."""
+    checks = [exit_before_entry_case()]
+
+    df = clean_rows(generate_raw(n_rows, seed), REFERENCE_DATE)
+    # Sebagian baris dibuat keluar sebelum masuk
+    broken = df.index[::50]
+    df.loc[broken, 'Tanggal Keluar'] = df.loc[broken, 'Tanggal Masuk'] - pd.Timedelta(days=30)
+    index = ActiveIntervalIndex(df, REFERENCE_DATE)
+
+    expected = len(filter_active_only(df, REFERENCE_DATE))
+    checks.append((
+        'count_at(today) = filter_active_only',
+        index.count_at(REFERENCE_DATE) == expected,
+        f"{index.count_at(REFERENCE_DATE):,} / {expected:,}",
+    ))
+
+    for start, end in PERIODS:
+        union = np.zeros(len(df), dtype=bool)
+        for day in pd.date_range(start, end):
+            union |= index.mask_at(day)
+        mask = index.mask_during(start, end)
+        checks.append((
+            f"periode {start:%Y-%m-%d}..{end:%Y-%m-%d} = gabungan per hari",
+            bool((mask == union).all()) and index.count_during(start, end) == int(union.sum()),
+            f"{int(mask.sum()):,} / {int(union.sum()):,}",
+        ))
+    return checks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='10k')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, ok, detail in run_checks(parse_size(args.rows), args.seed):
+        failed = failed or not ok
+        print(f"{'OK  ' if ok else 'GAGAL'} {name}" + (f"  ({detail})" if detail else ''))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Cek pergantian hari pada data bersih (tanpa Streamlit).
+
+Hasil cleaning bergantung pada tanggal hari ini (status PENSIUN/RESIGN,
+usia, masa kerja), jadi data mentah yang sama harus menghasilkan versi
+dataset berbeda pada hari berikutnya, dan `IncrementalSync.get()` harus
+memicu refresh begitu hari berganti. Semua cache per versi (indeks filter,
+indeks tabel, ekspor) bergantung pada hal ini.
+
+    python -m bench.rollover                # gagal bila ada cek yang gagal
+    python -m bench.rollover --rows 20k
+"""
+import argparse
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from bench.run import parse_size
+from bench.synthetic import generate_raw
+from engine.sources import DataSource
+from engine.sync import IncrementalSync
+
+
+class FrameSource(DataSource):
+    """Sumber tetap dari DataFrame di memori."""
+
+    name = 'frame'
+
+    def __init__(self, df):
+        self.df = df
+
+    def read(self):
+        return self.df
+
+
+def run_checks(n_rows, seed=0):
+    """Daftar (nama cek, lolos, keterangan)."""
+    today = pd.Timestamp(datetime.now().date())
+    yesterday = today - pd.Timedelta(days=1)
+    raw = generate_raw(n_rows, seed, today=yesterday)
+    sync = IncrementalSync(FrameSource(raw))
+
+    old = sync.apply(raw, today=yesterday)
+    same_day = sync.apply(raw, today=yesterday)
+    checks = [(
+        'versi stabil di hari yang sama',
+        old.attrs['version'] == same_day.attrs['version'] and sync.last_stats['cleaned'] == 0,
+        f"{old.attrs['version']} / {same_day.attrs['version']}",
+    )]
+    checks.append((
+        'data kemarin dianggap basi hari ini',
+        not sync.is_stale(today=yesterday) and sync.is_stale(today=today),
+        '',
+    ))
+
+    served = sync.get(today=today)
+    checks.append(('get() tetap melayani versi lama', served is same_day, ''))
+    if sync._background is not None:
+        sync._background.join()
+    new = sync.current()
+    checks.append((
+        'refresh background membersihkan ulang untuk hari ini',
+        new is not same_day and sync.last_stats.get('full', False) and not sync.is_stale(today=today),
+        f"last_stats={sync.last_stats}",
+    ))
+
+    usia_changed = int((new['Usia'] != old['Usia']).sum()) if 'Usia' in new.columns else 0
+    checks.append((
+        'versi dataset berganti',
+        new.attrs['version'] != old.attrs['version'],
+        f"{old.attrs['version']} -> {new.attrs['version']}, Usia berubah di {usia_changed:,} baris",
+    ))
+    return checks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='5k')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, ok, detail in run_checks(parse_size(args.rows), args.seed):
+        failed = failed or not ok
+        print(f"{'OK  ' if ok else 'GAGAL'} {name}" + (f"  ({detail})" if detail else ''))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""Benchmark per tahap pipeline dashboard pada beberapa skala data.
+
+Contoh:
+
+    python -m bench.run                                   # 1k, 10k, 100k, 1M baris
+    python -m bench.run --sizes 10k 100k --repeat 5 --output bench-main.json
+    python -m bench.run --compare bench-main.json         # gagal bila ada regresi
+
+Setiap tahap dijalankan `--repeat` kali tanpa tracing (waktu terbaik dan
+median dicatat), lalu sekali lagi di bawah `tracemalloc` untuk memori
+puncak per tahap. Alokasi numpy/pandas ikut terhitung; buffer milik
+pyarrow (ekspor Parquet) tidak terlihat oleh tracemalloc.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from bench.synthetic import REFERENCE_DATE, generate_raw
+from engine.active import ActiveIntervalIndex, filter_active_only
+from engine.aggregates import aggregate_locations, compute_aggregates, location_column
+from engine.export import WRITERS
+from engine.facets import compute_facets, placement_codes
+from engine.filters import FILTER_COLUMNS, FilterIndex
+from engine.gazetteer import load_port_index
+from engine.headcount import HeadcountIndex, previous_period_end
+from engine.maplayer import map_markers
+from engine.pipeline import run_dashboard
+from engine.schema import project_raw
+from engine.sync import IncrementalSync
+from engine.views import DataView
+
+DEFAULT_SIZES = ['1k', '10k', '100k', '1M']
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 1.25
+# Tahap di bawah batas ini terlalu bising untuk dibandingkan antar versi
+NOISE_FLOOR_SECONDS = 0.005
+
+# Pilihan filter representatif: dua unit, satu jenis, rentang Tanggal Masuk
+SELECTIONS = {'Unit Kerja': ['HO', 'CABANG MERAK'], 'Jenis': ['Laut']}
+DATE_RANGE = (pd.Timestamp('2005-01-01'), REFERENCE_DATE)
+CHANGED_SHARE = 0.01
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1M' -> 1000000."""
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    text = str(text).strip().lower()
+    if text[-1:] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+
+def _changed_rows(raw):
+    """Salinan `raw` dengan sebagian kecil baris diubah, untuk refresh inkremental."""
+    raw = raw.copy()
+    rows = np.arange(0, len(raw), max(1, int(1 / CHANGED_SHARE)))
+    raw.loc[raw.index[rows], 'Jabatan'] = 'Staf Mutasi'
+    return raw
+
+
+def _stage_clean(ctx):
+    ctx['sync'] = IncrementalSync(source=None)
+    ctx['df'] = ctx['sync'].apply(ctx['raw'], today=ctx['today'])
+
+
+def _stage_sync_incremental(ctx):
+    ctx['sync'].apply(ctx['raw_changed'], today=ctx['today'])
+
+
+def _stage_filter_index(ctx):
+    ctx['filter_index'] = FilterIndex(ctx['df'], FILTER_COLUMNS)
+
+
+def _stage_filter(ctx):
+    ctx['view'] = DataView(ctx['df'], ctx['filter_index'].rows(SELECTIONS, DATE_RANGE))
+
+
+def _stage_interval_index(ctx):
+    ctx['intervals'] = ActiveIntervalIndex(ctx['df'], ctx['today'])
+
+
+def _stage_active(ctx):
+    ctx['active'] = filter_active_only(ctx['view'], today=ctx['today'], index=ctx['intervals'])
+
+
+def _stage_facets(ctx):
+    compute_facets(ctx['active'])
+
+
+def _stage_headcount(ctx):
+    headcount = HeadcountIndex(ctx['intervals'])
+    headcount.at(ctx['previous_date'], ctx['view'].rows)
+    headcount.monthly(ctx['view'].rows, end=ctx['today'])
+
+
+def _stage_map(ctx):
+    view = ctx['view']
+    location_col = location_column(view)
+    if location_col is not None:
+        lokasi_counts = aggregate_locations(view, location_col, placement_codes(view))
+        map_markers(lokasi_counts, location_col, ctx['port_index'])
+
+
+def _stage_aggregates(ctx):
+    compute_aggregates(ctx['view'], ctx['df'], ctx['intervals'], ctx['today'], ctx['previous_date'])
+
+
+def _stage_pipeline(ctx):
+    run_dashboard(ctx['df'], SELECTIONS, DATE_RANGE, ctx['today'], ctx['previous_date'],
+                  filter_index=ctx['filter_index'], intervals=ctx['intervals'])
+
+
+def _export_stage(fmt):
+    def stage(ctx):
+        path = os.path.join(ctx['export_dir'], f'bench.{fmt.lower()}')
+        WRITERS[fmt](ctx['view'], path)
+        os.remove(path)
+    return stage
+
+
+STAGES = [
+    ('project', lambda ctx: project_raw(ctx['raw'])),
+    ('clean', _stage_clean),
+    ('sync_incremental', _stage_sync_incremental),
+    ('filter_index', _stage_filter_index),
+    ('filter', _stage_filter),
+    ('interval_index', _stage_interval_index),
+    ('active', _stage_active),
+    ('facets', _stage_facets),
+    ('headcount', _stage_headcount),
+    ('map', _stage_map),
+    ('aggregates', _stage_aggregates),
+    ('pipeline', _stage_pipeline),
+]
+
+
+def run_size(n_rows, repeat=DEFAULT_REPEAT, formats=('CSV', 'Parquet'), seed=0, port_index=None):
+    """Hasil benchmark satu skala: daftar dict per tahap."""
+    if port_index is None:
+        port_index = load_port_index()
+
+    raw = generate_raw(n_rows, seed=seed, ports=sorted(port_index))
+    stages = STAGES + [(f'export_{fmt.lower()}', _export_stage(fmt)) for fmt in formats]
+    timings = {name: [] for name, _ in stages}
+    peaks = {}
+
+    with tempfile.TemporaryDirectory(prefix='dashboard-bench-') as export_dir:
+        ctx = {
+            'raw': raw,
+            'raw_changed': _changed_rows(raw),
+            'today': REFERENCE_DATE,
+            'previous_date': previous_period_end(REFERENCE_DATE),
+            'port_index': port_index,
+            'export_dir': export_dir,
+        }
+        for _ in range(repeat):
+            for name, stage in stages:
+                start = time.perf_counter()
+                stage(ctx)
+                timings[name].append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            for name, stage in stages:
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                stage(ctx)
+                _, peak = tracemalloc.get_traced_memory()
+                peaks[name] = peak - before
+        finally:
+            tracemalloc.stop()
+        filtered_rows = len(ctx['view'])
+
+    return [
+        {
+            'rows': n_rows,
+            'filtered_rows': filtered_rows,
+            'stage': name,
+            'seconds_min': min(timings[name]),
+            'seconds_median': statistics.median(timings[name]),
+            'peak_mb': peaks[name] / 2**20,
+        }
+        for name, _ in stages
+    ]
+
+
+def environment():
+    """Versi yang memengaruhi hasil, agar file hasil bisa dibandingkan dengan jujur."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def format_table(results):
+    lines = [f"{'rows':>9} {'stage':<18} {'min (ms)':>10} {'median (ms)':>12} {'peak (MB)':>10}"]
+    for r in results:
+        lines.append(
+            f"{r['rows']:>9,} {r['stage']:<18} {r['seconds_min'] * 1000:>10.1f} "
+            f"{r['seconds_median'] * 1000:>12.1f} {r['peak_mb']:>10.1f}"
+        )
+    return '\n'.join(lines)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Daftar (rows, stage, lama, baru) untuk tahap yang melambat melebihi `threshold`."""
+    old = {(r['rows'], r['stage']): r['seconds_min'] for r in baseline['results']}
+    regressions = []
+    for r in results:
+        before = old.get((r['rows'], r['stage']))
+        if before is None or max(before, r['seconds_min']) < NOISE_FLOOR_SECONDS:
+            continue
+        if r['seconds_min'] > before * threshold:
+            regressions.append((r['rows'], r['stage'], before, r['seconds_min']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help="jumlah baris, mis. 1k 10k 100k 1M")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--formats', nargs='*', default=['CSV', 'Parquet'], choices=sorted(WRITERS),
+                        help="format ekspor yang diukur (XLSX lambat untuk data besar)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="tulis hasil sebagai JSON ke path ini")
+    parser.add_argument('--compare', help="JSON hasil sebelumnya sebagai pembanding")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="rasio waktu minimum yang dianggap regresi")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        n_rows = parse_size(size)
+        size_results = run_size(n_rows, repeat=args.repeat, formats=args.formats, seed=args.seed)
+        print(format_table(size_results), flush=True)
+        results.extend(size_results)
+
+    report = {'environment': environment(), 'repeat': args.repeat, 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for rows, stage, before, after in regressions:
+            print(f"REGRESI {rows:,} baris / {stage}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+        if regressions:
+            return 1
+        print(f"Tidak ada regresi di atas {args.threshold:.2f}x dibanding {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
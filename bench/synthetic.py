@@ -0,0 +1,99 @@
+"""Data karyawan sintetis dengan skema sheet asli.
+
+Kolom memakai nama mentah yang di-rename oleh `clean_data` (`RENAME_MAP`)
+ditambah Jenis, Band Level, Kelas Kapal, Segmen, dan seterusnya. Lokasi
+kerja diambil dari nama pelabuhan di `data_pelabuhan.geojson`, dengan
+sebagian kecil nilai yang tidak ada di gazetteer seperti data sungguhan.
+Semua kolom dibangkitkan secara vektor sehingga 1 juta baris tetap cepat.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from engine.gazetteer import GEOJSON_PATH, NAME_KEY
+
+REFERENCE_DATE = pd.Timestamp('2025-10-01')
+
+STATUSES = (['Employee', 'Contract ', 'cuti', 'Terminated', 'Pensiun', 'Resign'], [.6, .28, .03, .03, .03, .03])
+UNITS = ['HO', 'REGIONAL I', 'REGIONAL II', 'REGIONAL III', 'CABANG MERAK', 'CABANG BAKAUHENI', 'CABANG KETAPANG']
+SUB_UNITS = ['Jakarta Pusat', 'merak ', 'BAKAUHENI', 'Ketapang', 'gilimanuk', 'Lembar', 'Kayangan']
+JENIS = (['Laut', 'Darat', 'Kapal Laut', None], [.45, .45, .05, .05])
+KELAS_KAPAL = ['Kelas A', 'Kelas B', 'Kelas C', 'Kelas D', None]
+SEGMEN = ['Lintasan Komersial', 'Lintasan Perintis', 'Lintasan Jarak Jauh', None]
+JABATAN = ['Nakhoda', 'Mualim', 'Masinis', 'Juru Mudi', 'Staf', 'Supervisor', 'Manager', 'Kepala Cabang']
+GENDER = (['L', 'P', 'l ', 'Perempuan'], [.55, .35, .05, .05])
+BAND_LEVELS = [f'D-{i}' for i in range(1, 8)] + [f'BOD-{i}' for i in range(1, 4)]
+KLASIFIKASI = ['Analis', 'Senior Analis', 'Officer', 'Supervisor', 'Manager', 'Staf']
+DEPARTMENTS = [
+    'OPERASIONAL TI', 'PENGEMBANGAN TI', 'PELAYANAN TI', 'MANAJEMEN HCIS DAN DATA SDM',
+    'KEUANGAN', 'AKUNTANSI', 'PENGADAAN', 'HUKUM', 'TEKNIK KAPAL', 'OPERASI PELABUHAN',
+    'KOMERSIAL', 'PEMASARAN', 'AUDIT INTERNAL', 'MANAJEMEN RISIKO', 'SEKRETARIAT PERUSAHAAN',
+]
+PENDIDIKAN = ['SMA', 'D3', 'D4', 'S1', 'S2', 'S3']
+UNKNOWN_LOCATION_SHARE = 0.05
+
+
+def port_names(path=GEOJSON_PATH):
+    """Nama pelabuhan unik dari gazetteer."""
+    with open(path, encoding='utf-8') as f:
+        features = json.load(f).get('features', [])
+    return sorted({feature['properties'][NAME_KEY] for feature in features if NAME_KEY in feature.get('properties', {})})
+
+
+def _choice(rng, values, n, p=None):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=p)]
+
+
+def _days(base, offsets):
+    return pd.Series(np.datetime64(base, 'ns') + offsets.astype('timedelta64[D]'))
+
+
+def generate_raw(n_rows, seed=0, ports=None, today=REFERENCE_DATE):
+    """DataFrame mentah `n_rows` baris, deterministik untuk `seed` yang sama."""
+    rng = np.random.default_rng(seed)
+    if ports is None:
+        ports = port_names()
+    today = pd.Timestamp(today)
+
+    ids = np.arange(n_rows)
+    dob = _days('1962-01-01', rng.integers(0, 15_000, n_rows))
+    join = dob + pd.to_timedelta(rng.integers(19 * 365, 40 * 365, n_rows), unit='D')
+    join = join.where(join <= today, pd.Series(today - pd.to_timedelta(rng.integers(0, 365, n_rows), unit='D')))
+
+    exit_date = join + pd.to_timedelta(rng.integers(90, 8_000, n_rows), unit='D')
+    exit_date[rng.random(n_rows) < 0.85] = pd.NaT
+    resign = pd.Series(today + pd.to_timedelta(rng.integers(-720, 720, n_rows), unit='D'))
+    resign[rng.random(n_rows) < 0.9] = pd.NaT
+
+    locations = _choice(rng, list(ports), n_rows)
+    locations[rng.random(n_rows) < UNKNOWN_LOCATION_SHARE] = 'TIDAK DIKETAHUI'
+
+    nik = 1_000_000_000 + ids
+    return pd.DataFrame({
+        'No.': ids + 1,
+        'NIK': nik,
+        'ASDP.NIK': pd.Series(nik).astype(str).radd('ASDP.'),
+        'Nama': pd.Series(ids).astype(str).radd('KARYAWAN '),
+        'Keaktifan': _choice(rng, ['Permanent', 'Contract'], n_rows),
+        'Status_Kepegawaian': _choice(rng, STATUSES[0], n_rows, p=STATUSES[1]),
+        'Unit_Kerja': _choice(rng, UNITS, n_rows),
+        'Sub_unker': _choice(rng, SUB_UNITS, n_rows),
+        'Jenis': _choice(rng, JENIS[0], n_rows, p=JENIS[1]),
+        'Kelas_Kapal': _choice(rng, KELAS_KAPAL, n_rows),
+        'Segmen': _choice(rng, SEGMEN, n_rows),
+        'Jabatan': _choice(rng, JABATAN, n_rows),
+        'TglLahir': dob,
+        'Jenis_Kelamin': _choice(rng, GENDER[0], n_rows, p=GENDER[1]),
+        'Band Level': _choice(rng, BAND_LEVELS, n_rows),
+        'Klasifikasi_Jabatan': _choice(rng, KLASIFIKASI, n_rows),
+        'Department_Name': _choice(rng, DEPARTMENTS, n_rows),
+        'Retirement Date': dob + pd.DateOffset(years=56),
+        'Lokasi_Kerja': locations,
+        'Date of Joining': join,
+        'Date Of Exit': exit_date,
+        'Tanggal Resign': resign,
+        'Tingkat Pendidikan': _choice(rng, PENDIDIKAN, n_rows),
+        # Kolom di luar skema dashboard, ikut dibaca seperti pada sheet asli
+        'Bagian': np.full(n_rows, np.nan),
+    })
@@ -0,0 +1 @@
+"""Inti komputasi dashboard yang tidak bergantung pada Streamlit."""
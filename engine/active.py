@@ -0,0 +1,135 @@
+"""Penentuan karyawan yang aktif pada suatu tanggal.
+
+`ActiveIntervalIndex` menyimpan interval aktif setiap karyawan sekali per
+dataset, terurut menurut tanggal awal dan tanggal akhir. Jumlah karyawan
+aktif pada suatu tanggal/periode cukup binary search, dan himpunan
+barisnya dibangun dari prefiks kedua urutan tanpa membandingkan ulang
+kolom tanggal seluruh frame.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Status kepegawaian yang berarti karyawan sudah tidak aktif
+INACTIVE_STATUSES = ['RESIGN', 'PENSIUN', 'TERMINATED']
+
+NAT = np.iinfo(np.int64).min
+NEVER = np.iinfo(np.int64).max
+
+
+def _ns(values):
+    return np.asarray(values, dtype='datetime64[ns]').view('i8')
+
+
+def active_intervals(df, today):
+    """Interval aktif [Tanggal Masuk, min(Tanggal Keluar, Tanggal Pensiun)) per baris.
+
+    Dikembalikan sebagai dua array int64 (nanodetik). Karyawan berstatus
+    keluar dianggap selesai paling lambat `today`; yang berstatus keluar
+    tanpa tanggal keluar/pensiun, atau tanpa Tanggal Masuk, tidak pernah
+    aktif (start = end = NEVER), begitu pula interval kosong. Untuk `today`
+    yang sama dengan tanggal pembersihan, aktif pada `today` sama dengan
+    hasil `filter_active_only`.
+    """
+    n = len(df)
+    starts = _ns(df['Tanggal Masuk']).copy() if 'Tanggal Masuk' in df.columns else np.full(n, NAT)
+    ends = np.full(n, NEVER)
+    for col in ('Tanggal Keluar', 'Tanggal Pensiun'):
+        if col in df.columns:
+            values = _ns(df[col])
+            ends = np.where(values == NAT, ends, np.minimum(ends, values))
+
+    if 'Status Kepegawaian' in df.columns:
+        inactive = np.asarray(df['Status Kepegawaian'].isin(INACTIVE_STATUSES), dtype=bool)
+        starts[inactive & (ends == NEVER)] = NAT
+        ends[inactive] = np.minimum(ends[inactive], _ns([today])[0])
+
+    starts[starts == NAT] = NEVER
+    # Interval kosong (keluar sebelum/saat masuk) tidak pernah aktif, juga
+    # untuk query periode: disamakan dengan baris tanpa Tanggal Masuk
+    empty = ends <= starts
+    starts[empty] = NEVER
+    ends[empty] = NEVER
+    return starts, ends
+
+
+class ActiveIntervalIndex:
+    """Interval aktif semua baris `df`, untuk query titik waktu dan periode."""
+
+    def __init__(self, df, today):
+        self.today = pd.Timestamp(today)
+        self.n_rows = len(df)
+        starts, ends = active_intervals(df, self.today)
+        self.start_order = np.argsort(starts, kind='stable')
+        self.starts = starts[self.start_order]
+        self.end_order = np.argsort(ends, kind='stable')
+        self.ends = ends[self.end_order]
+
+    def _mask(self, n_started, n_ended):
+        # Yang sudah keluar selalu sudah masuk (end >= start), jadi cukup
+        # tandai prefiks urutan masuk lalu hapus prefiks urutan keluar.
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.start_order[:n_started]] = True
+        mask[self.end_order[:n_ended]] = False
+        return mask
+
+    def _point_bounds(self, date):
+        t = _ns([pd.Timestamp(date)])[0]
+        return np.searchsorted(self.starts, t, side='right'), np.searchsorted(self.ends, t, side='right')
+
+    def _period_bounds(self, start, end):
+        # Aktif minimal satu hari: masuk <= end dan keluar > start
+        n_started = np.searchsorted(self.starts, _ns([pd.Timestamp(end)])[0], side='right')
+        n_ended = np.searchsorted(self.ends, _ns([pd.Timestamp(start)])[0], side='right')
+        return n_started, n_ended
+
+    def count_at(self, date):
+        """Jumlah karyawan aktif pada `date`."""
+        n_started, n_ended = self._point_bounds(date)
+        return int(n_started - n_ended)
+
+    def mask_at(self, date):
+        """Mask baris yang aktif pada `date`."""
+        return self._mask(*self._point_bounds(date))
+
+    def count_during(self, start, end):
+        """Jumlah karyawan yang aktif setidaknya satu hari dalam [start, end]."""
+        n_started, n_ended = self._period_bounds(start, end)
+        return int(max(n_started - n_ended, 0))
+
+    def mask_during(self, start, end):
+        """Mask baris yang aktif setidaknya satu hari dalam [start, end]."""
+        return self._mask(*self._period_bounds(start, end))
+
+
+def filter_active_only(df, today=None, index=None):
+    """Dari DataFrame/DataView apa pun, ambil hanya karyawan yang aktif pada `today`.
+
+    Bila `index` (`ActiveIntervalIndex` atas frame dasar `df`) diberikan,
+    mask diambil dari indeks tersebut alih-alih dihitung ulang per kolom.
+    """
+    if df.empty:
+        return df
+    if today is None:
+        today = pd.Timestamp(datetime.now().date())
+
+    if index is not None:
+        mask = index.mask_at(today)
+        rows = getattr(df, 'rows', None)
+        return df[mask if rows is None else mask[rows]]
+
+    # 1. Karyawan harus sudah masuk
+    mask = (df['Tanggal Masuk'].notna()) & (df['Tanggal Masuk'] <= today)
+
+    # 2. Karyawan harus belum keluar (Tanggal Keluar >= Hari Ini ATAU kosong)
+    if 'Tanggal Keluar' in df.columns:
+        mask &= (df['Tanggal Keluar'].isna()) | (df['Tanggal Keluar'] >= today)
+    if 'Tanggal Pensiun' in df.columns:
+        mask &= (df['Tanggal Pensiun'].isna()) | (df['Tanggal Pensiun'] >= today)
+
+    # 3. Status kepegawaian bukan merupakan status keluar
+    if 'Status Kepegawaian' in df.columns:
+        mask &= ~df['Status Kepegawaian'].isin(INACTIVE_STATUSES)
+
+    return df[mask]
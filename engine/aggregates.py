@@ -0,0 +1,184 @@
+"""Semua agregat dashboard untuk satu state filter.
+
+`compute_aggregates` menjalankan filter karyawan aktif, facet, KPI, tren
+headcount, dan agregat lokasi peta sekali; hasilnya (`DashboardAggregates`) tidak
+bergantung pada sesi sehingga bisa disimpan di `ResultCache` dan dipakai
+ulang oleh semua pengguna yang melihat state filter yang sama.
+
+Turunan kecil untuk tampilan (ringkasan KPI, tabel generasi, tipe kantor)
+juga dihitung di sini, sehingga app.py hanya merender.
+"""
+import numpy as np
+import pandas as pd
+
+from engine.active import filter_active_only
+from engine.cleaning import PLACEMENTS
+from engine.demographics import GENERATION_ORDER
+from engine.facets import _as_codes, compute_facets, crosstab, placement_codes
+from engine.headcount import HeadcountIndex
+from engine.metrics import span
+from engine.views import DataView
+
+LOCATION_COLUMNS = ['Lokasi Kerja', 'Sub Unit Kerja']
+
+# Jendela tabel "mendekati pensiun/resign" dalam bulan
+PENSION_WINDOW_MONTHS = 12
+RESIGN_WINDOW_MONTHS = 1
+
+OFFICE_TYPES = ['Kantor Pusat', 'Regional', 'Kantor Cabang']
+
+
+class DashboardAggregates:
+    """Hasil agregat read-only untuk satu (versi dataset, state filter, tanggal)."""
+
+    def __init__(self, active_rows, facets, avg_masa_kerja, previous_total, trend,
+                 location_col, lokasi_counts, status_placement, pension_rows=None, resign_rows=None):
+        self.active_rows = active_rows
+        self.facets = facets
+        self.avg_masa_kerja = avg_masa_kerja
+        self.previous_total = previous_total
+        self.trend = trend
+        self.location_col = location_col
+        self.lokasi_counts = lokasi_counts
+        self.status_placement = status_placement
+        self.pension_rows = pension_rows
+        self.resign_rows = resign_rows
+
+    def placement_counts(self, status):
+        """Jumlah Laut/Darat untuk satu Status Kepegawaian (semua baris hasil filter)."""
+        if self.status_placement is None or status not in self.status_placement.index:
+            return {placement: 0 for placement in PLACEMENTS}
+        return {placement: int(n) for placement, n in self.status_placement.loc[status].items()}
+
+    def kpis(self, has_placement=True):
+        return KpiSummary(self.facets, self.previous_total, self.avg_masa_kerja, has_placement)
+
+
+class KpiSummary:
+    """Angka kartu KPI: total aktif, Laut/Darat, perubahan vs periode lalu."""
+
+    def __init__(self, facets, previous_total, avg_masa_kerja, has_placement=True):
+        self.total = facets.total
+        self.laut = facets.split_totals['Laut'] if has_placement else 0
+        # Darat = sisa karyawan aktif (termasuk yang Jenis-nya tidak dikenali)
+        self.darat = self.total - self.laut if has_placement else 0
+        self.avg_masa_kerja = avg_masa_kerja
+        # Tanpa data bulan lalu, pembagi 1 agar tidak membagi dengan nol
+        previous = previous_total if previous_total > 0 else 1
+        self.percentage_change = (self.total - previous) / previous * 100
+
+    def share(self, count):
+        return count / self.total * 100 if self.total > 0 else 0
+
+
+def generation_table(facets):
+    """Jumlah dan persentase per generasi (tanpa Unknown), urut kronologis."""
+    counts = facets.counts('Generasi').drop('Unknown', errors='ignore')
+    counts = counts.reindex([g for g in GENERATION_ORDER if g in counts.index])
+    table = counts.rename_axis('Generasi').reset_index(name='Jumlah')
+    table['Persentase'] = (table['Jumlah'] / facets.total * 100).round(1) if facets.total else 0.0
+    return table
+
+
+def classify_office_type(unit_kerja):
+    unit_kerja = str(unit_kerja).upper()
+    if 'HO' in unit_kerja:
+        return 'Kantor Pusat'
+    if 'REGIONAL' in unit_kerja:
+        return 'Regional'
+    return 'Kantor Cabang'
+
+
+def office_type_counts(unit_counts):
+    """Jumlah per tipe kantor dari hitungan per Unit Kerja."""
+    types = unit_counts.index.map(classify_office_type)
+    summary = unit_counts.groupby(np.asarray(types)).sum()
+    summary = summary.reindex([t for t in OFFICE_TYPES if t in summary.index])
+    return summary.rename_axis('Tipe Kantor').reset_index(name='Jumlah')
+
+
+def nearing_rows(view, col, max_months):
+    """Posisi baris (di frame dasar) dengan 0 <= `col` <= `max_months`, atau None."""
+    if col not in view.columns:
+        return None
+    if not isinstance(view, DataView):
+        view = DataView(view)
+    months = view[col]
+    rows = view.where((months >= 0) & (months <= max_months)).rows
+    return rows.astype(np.int32 if len(view.base) < 2**31 else np.int64)
+
+
+def location_column(df):
+    return next((col for col in LOCATION_COLUMNS if col in df.columns), None)
+
+
+def placement_table(df, col, place_codes):
+    """Tabel silang `col` × Penempatan sebagai DataFrame (kolom = PLACEMENTS)."""
+    codes, categories = _as_codes(df[col])
+    table = crosstab(codes, len(categories), place_codes)
+    return pd.DataFrame(table.T, index=pd.Index(categories, name=col), columns=PLACEMENTS)
+
+
+def aggregate_locations(df, location_col, place_codes=None):
+    """Jumlah karyawan per lokasi (menurun) beserta pecahan Laut/Darat."""
+    counts = df[location_col].value_counts()
+    counts = counts[counts > 0]
+    lokasi_counts = counts.rename_axis(location_col).reset_index()
+    lokasi_counts.columns = [location_col, 'Jumlah Karyawan']
+
+    if place_codes is not None:
+        table = placement_table(df, location_col, place_codes)
+        split = table.reindex(lokasi_counts[location_col].to_numpy())
+        for placement in PLACEMENTS:
+            lokasi_counts[placement] = split[placement].to_numpy().astype(int)
+    return lokasi_counts
+
+
+def compute_aggregates(df_filtered, df_base, intervals, today, previous_date):
+    """Agregat dashboard dari `df_filtered` (DataView atas `df_base`).
+
+    `intervals` adalah `ActiveIntervalIndex` atas `df_base`; karyawan aktif,
+    headcount periode lalu, dan tren bulanan dihitung darinya untuk baris
+    hasil filter yang sama.
+    """
+    with span('aggregates.active'):
+        df_analysis = filter_active_only(df_filtered, today=today, index=intervals)
+    active_rows = getattr(df_analysis, 'rows', None)
+    if active_rows is not None:
+        active_rows = active_rows.astype(np.int32 if len(df_base) < 2**31 else np.int64)
+
+    with span('aggregates.facets') as s:
+        facets = compute_facets(df_analysis)
+        s.rows = len(df_analysis)
+
+    avg_masa_kerja = 0
+    if 'Masa Kerja' in df_analysis.columns and not df_analysis['Masa Kerja'].isnull().all():
+        avg_masa_kerja = df_analysis['Masa Kerja'].mean()
+
+    rows = getattr(df_filtered, 'rows', None)
+    with span('aggregates.headcount'):
+        headcount = HeadcountIndex(intervals)
+        previous_total = headcount.at(previous_date, rows)
+        trend = headcount.monthly(rows, end=today)
+
+    # Satu kode Penempatan untuk peta dan kartu pensiun/resign
+    place_codes = placement_codes(df_filtered)
+
+    location_col = location_column(df_filtered)
+    lokasi_counts = None
+    if location_col is not None:
+        with span('aggregates.locations') as s:
+            lokasi_counts = aggregate_locations(df_filtered, location_col, place_codes)
+            s.rows = len(df_filtered)
+
+    status_placement = None
+    if place_codes is not None and 'Status Kepegawaian' in df_filtered.columns:
+        status_placement = placement_table(df_filtered, 'Status Kepegawaian', place_codes)
+
+    pension_rows = nearing_rows(df_filtered, 'Bulan Menuju Pensiun', PENSION_WINDOW_MONTHS)
+    resign_rows = nearing_rows(df_filtered, 'Bulan Menuju Resign', RESIGN_WINDOW_MONTHS)
+
+    return DashboardAggregates(
+        active_rows, facets, avg_masa_kerja, previous_total, trend,
+        location_col, lokasi_counts, status_placement, pension_rows, resign_rows
+    )
@@ -0,0 +1,77 @@
+"""Cache hasil agregat yang dibagi semua sesi dalam satu proses.
+
+Kunci dibentuk pemanggil (mis. versi dataset + hash state filter), nilai
+disimpan apa adanya dan dianggap read-only. Entri dibuang bila sudah
+melewati TTL atau bila cache penuh (yang paling lama tidak dipakai lebih
+dulu). Counter hit/miss/eviction bisa dibaca lewat `stats()`.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """LRU + TTL yang aman dipakai dari banyak thread sesi."""
+
+    def __init__(self, max_entries=64, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (kedaluwarsa, nilai)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Nilai untuk `key`; bila belum ada, hitung dengan `compute()` lalu simpan.
+
+        Perhitungan berjalan di luar lock, jadi dua sesi yang miss bersamaan
+        bisa menghitung dua kali, tetapi tidak saling menunggu.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
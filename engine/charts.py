@@ -0,0 +1,47 @@
+"""Data chart yang ringkas dan kunci cache spec chart.
+
+Spec chart (dict Vega-Lite atau figure Plotly) disimpan per isi data
+masukannya, sehingga rerun dan sesi lain dengan agregat yang sama tidak
+membangun ulang spec. Cache ini hanya menghemat pembangunan spec:
+Streamlit tetap mengirim spec lengkap ke browser setiap rerun. Ukuran
+payload itu dibatasi dengan memotong dimensi berkardinalitas tinggi
+menjadi N kategori teratas ditambah satu baris "Lainnya".
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+MAX_CATEGORIES = 12
+OTHER_LABEL = 'Lainnya'
+
+
+def top_n_rollup(counts, n=MAX_CATEGORIES, other_label=OTHER_LABEL):
+    """`counts` (menurun) dengan kategori di luar N teratas digabung ke `other_label`.
+
+    Kategori asli yang sudah bernama `other_label` ikut masuk baris gabungan,
+    sehingga label itu tidak pernah muncul dua kali.
+    """
+    # Satu kategori sisa tidak perlu digabung
+    if len(counts) <= n + 1:
+        return counts
+    counts = counts.sort_values(ascending=False, kind='stable')
+    labels = counts.index.astype(str)
+    values = counts.to_numpy()
+    keep = (np.arange(len(counts)) < n) & (labels != other_label)
+    index = pd.Index(labels[keep].append(pd.Index([other_label])), name=counts.index.name)
+    return pd.Series(np.append(values[keep], values[~keep].sum()), index=index, name=counts.name)
+
+
+def data_key(data):
+    """Hash stabil dari isi DataFrame/Series kecil masukan chart."""
+    digest = hashlib.sha1(repr(
+        list(data.columns) if isinstance(data, pd.DataFrame) else data.name
+    ).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def chart_key(name, data):
+    """Kunci cache spec: nama chart (termasuk gaya/parameter tetapnya) + isi data."""
+    return name, data_key(data)
@@ -0,0 +1,191 @@
+"""Pipeline pembersihan data karyawan.
+
+Setiap kolom teks dinormalisasi dalam satu lintasan: nilai mentah yang
+berbeda di-factorize, masing-masing dipetakan sekali lewat tabel lookup,
+lalu hasilnya dikembalikan sebagai dtype `category`.
+"""
+import hashlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RENAME_MAP = {
+    'Status_Kepegawaian': 'Status Kepegawaian', 'Sub_unker': 'Sub Unit Kerja',
+    'Unit_Kerja': 'Unit Kerja', 'TglLahir': 'Tanggal Lahir',
+    'Keaktifan': 'Status Aktif', 'Klasifikasi_Jabatan': 'Klasifikasi Jabatan',
+    'Department_Name': 'Department Name', 'Retirement Date': 'Tanggal Pensiun',
+    'Jenis_Kelamin': 'Jenis Kelamin', 'Lokasi_Kerja': 'Lokasi Kerja',
+    'Date of Joining': 'Tanggal Masuk', 'Date Of Exit': 'Tanggal Keluar',
+    'Kelas_Kapal': 'Kelas Kapal'
+}
+
+DATE_COLUMNS = ['Tanggal Masuk', 'Tanggal Keluar', 'Tanggal Lahir', 'Tanggal Pensiun', 'Tanggal Resign']
+
+# Kolom berkardinalitas rendah yang disimpan sebagai dtype category apa adanya
+CATEGORICAL_COLUMNS = [
+    'Unit Kerja', 'Jenis', 'Lokasi Kerja', 'Klasifikasi Jabatan', 'Department Name',
+    'Band Level', 'Kelas Kapal', 'Segmen', 'Jabatan', 'Tingkat Pendidikan',
+]
+
+# Status yang membuat karyawan dianggap tidak aktif
+EXIT_STATUSES = ['PENSIUN', 'RESIGN', 'TERMINATED', 'CUTI']
+
+# Penempatan (Laut/Darat) diturunkan sekali dari isi kolom Jenis
+PLACEMENT_COLUMN = 'Penempatan'
+PLACEMENTS = ['Laut', 'Darat']
+
+
+def normalize_status(value):
+    value = str(value).upper().strip()
+    if 'CONTRACT' in value:
+        return 'PKWT'
+    if 'EMPLOYEE' in value:
+        return 'PKWTT'
+    return value
+
+
+def normalize_gender(value):
+    value = str(value).upper().strip()
+    if value.startswith('L'):
+        return 'Laki-laki'
+    if value.startswith('P'):
+        return 'Perempuan'
+    return value
+
+
+def normalize_upper(value):
+    return str(value).upper().strip()
+
+
+NORMALIZERS = {
+    'Status Kepegawaian': normalize_status,
+    'Jenis Kelamin': normalize_gender,
+    'Sub Unit Kerja': normalize_upper,
+}
+
+
+def to_categorical(series, normalizer=None):
+    """Factorize `series`, petakan tiap nilai unik sekali, hasilkan category.
+
+    Nilai kosong (NaN) tetap kosong dan tidak ikut dinormalisasi.
+    """
+    codes, uniques = pd.factorize(series)
+    values = [normalizer(u) for u in uniques] if normalizer else list(uniques)
+    lookup = pd.Categorical(values)
+    if len(uniques) == 0:
+        new_codes = codes
+    else:
+        new_codes = np.where(codes >= 0, lookup.codes[codes], -1)
+    return pd.Series(
+        pd.Categorical.from_codes(new_codes, categories=lookup.categories),
+        index=series.index, name=series.name
+    )
+
+
+def classify_placement(jenis):
+    """Kategori Laut/Darat dari kolom Jenis (tanpa membedakan huruf besar/kecil).
+
+    Dicocokkan per kategori lalu di-gather lewat kode; nilai yang tidak
+    memuat keduanya menjadi NaN, dan yang memuat keduanya dianggap Laut.
+    """
+    if not isinstance(jenis.dtype, pd.CategoricalDtype):
+        jenis = jenis.astype('category')
+    labels = jenis.cat.categories.astype(str).str.lower()
+    lookup = np.full(len(labels) + 1, -1, dtype=np.int8)
+    for code, placement in reversed(list(enumerate(PLACEMENTS))):
+        lookup[:-1][np.asarray(labels.str.contains(placement.lower(), regex=False), dtype=bool)] = code
+    return pd.Series(
+        pd.Categorical.from_codes(lookup[jenis.cat.codes.to_numpy()], categories=PLACEMENTS),
+        index=jenis.index, name=PLACEMENT_COLUMN
+    )
+
+
+def fingerprint(df, row_hashes=None, today=None):
+    """Hash isi DataFrame (nama kolom + nilai per baris) sebagai versi dataset.
+
+    `today` ikut di-hash: status PENSIUN/RESIGN dan kolom usia/masa kerja
+    berubah setiap hari walau data mentahnya sama.
+    """
+    if row_hashes is None:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.sha1(repr(list(df.columns)).encode('utf-8'))
+    if today is not None:
+        digest.update(pd.Timestamp(today).strftime('%Y-%m-%d').encode('ascii'))
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _has_values(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return bool((series.cat.codes.to_numpy() >= 0).any())
+    return bool(series.notna().any())
+
+
+def drop_empty_columns(df):
+    """Buang kolom yang seluruh nilainya kosong (dicek per kolom, tanpa mask seluruh frame)."""
+    return df.drop(columns=[col for col in df.columns if not _has_values(df[col])])
+
+
+def safe_date_conversion(df, date_cols):
+    """Konversi kolom tanggal dengan aman"""
+    for col in date_cols:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def clean_data(df_raw, today=None, drop_empty=True):
+    """Ganti nama kolom, konversi tanggal, normalisasi, dan tentukan status aktif."""
+    if today is None:
+        today = pd.Timestamp(datetime.now().date())
+
+    # --- 1. GANTI NAMA KOLOM ---
+    df = df_raw.rename(columns=RENAME_MAP)
+
+    # --- 2. KONVERSI TANGGAL ---
+    df = safe_date_conversion(df, DATE_COLUMNS)
+
+    # --- 3. CLEANING DATA (lookup per nilai unik) ---
+    status = None
+    if 'Status Kepegawaian' in df.columns:
+        status = to_categorical(df['Status Kepegawaian'], normalize_status)
+
+    for col, normalizer in NORMALIZERS.items():
+        if col in df.columns and col != 'Status Kepegawaian':
+            df[col] = to_categorical(df[col], normalizer)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = to_categorical(df[col])
+    if 'Jenis' in df.columns:
+        df[PLACEMENT_COLUMN] = classify_placement(df['Jenis'])
+
+    # --- 4. UPDATE STATUS BERDASARKAN TANGGAL ---
+    overrides = []
+    if 'Tanggal Pensiun' in df.columns:
+        overrides.append(('PENSIUN', (df['Tanggal Pensiun'] <= today).to_numpy()))
+    if 'Tanggal Keluar' in df.columns:
+        overrides.append(('RESIGN', (df['Tanggal Keluar'] <= today).to_numpy()))
+
+    if status is not None or overrides:
+        if status is None:
+            status = pd.Series(pd.Categorical([np.nan] * len(df)), index=df.index)
+        for label, mask in overrides:
+            if mask.any():
+                if label not in status.cat.categories:
+                    status = status.cat.add_categories([label])
+                status[mask] = label
+        df['Status Kepegawaian'] = status
+
+    # --- 5. TENTUKAN STATUS AKTIF/TIDAK AKTIF ---
+    if 'Status Kepegawaian' in df.columns:
+        inactive = df['Status Kepegawaian'].isin(EXIT_STATUSES).to_numpy()
+        df['Status Aktif'] = pd.Categorical.from_codes(
+            inactive.astype(np.int8), categories=['Aktif', 'Tidak Aktif']
+        )
+
+    # --- 6. HAPUS KOLOM KOSONG ---
+    if drop_empty:
+        df = drop_empty_columns(df)
+        df.attrs['version'] = fingerprint(df_raw, today=today)
+    return df
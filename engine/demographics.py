@@ -0,0 +1,77 @@
+"""Kolom turunan demografi dan kepegawaian.
+
+Usia, generasi, dan bulan menuju pensiun dari Tanggal Lahir; masa kerja
+dan bulan menuju resign dari Tanggal Masuk/Tanggal Resign.
+
+Semua perhitungan memakai aritmetika datetime64/NumPy atas seluruh kolom
+sekaligus (tanpa `.apply` per baris) dan dijalankan sekali per dataset
+yang sudah dibersihkan.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RETIREMENT_AGE = 60
+
+GENERATION_ORDER = ['Boomers', 'Gen X', 'Millenials', 'Gen Z']
+
+# Batas umur (selisih tahun lahir) per generasi, dari yang termuda
+GENERATION_BINS = [-np.inf, 27, 43, 59, np.inf]
+GENERATION_LABELS = ['Gen Z', 'Millenials', 'Gen X', 'Boomers']
+
+
+def classify_generation(dob, current_year):
+    """Kelompokkan tanggal lahir ke generasi berdasarkan selisih tahun."""
+    age = current_year - dob.dt.year
+    generasi = pd.cut(age, bins=GENERATION_BINS, labels=GENERATION_LABELS)
+    generasi = generasi.cat.reorder_categories(GENERATION_ORDER, ordered=True)
+    return generasi.cat.add_categories(['Unknown']).fillna('Unknown')
+
+
+def compute_age(dob, today):
+    """Usia penuh dalam tahun pada tanggal `today`."""
+    age = today.year - dob.dt.year
+    not_yet_birthday = (dob.dt.month * 100 + dob.dt.day) > (today.month * 100 + today.day)
+    return (age - not_yet_birthday.astype(int)).astype('Int64')
+
+
+def add_years(dates, years):
+    """Tambah `years` tahun ke kolom tanggal; 29 Feb jatuh ke 28 Feb bila perlu."""
+    year = dates.dt.year + years
+    month = dates.dt.month
+    first_of_month = pd.to_datetime({'year': year, 'month': month, 'day': 1}, errors='coerce')
+    day = np.minimum(dates.dt.day, first_of_month.dt.days_in_month)
+    return pd.to_datetime({'year': year, 'month': month, 'day': day}, errors='coerce')
+
+
+def months_until(dates, today):
+    """Selisih hari dari `today` dibagi 30 (dibulatkan ke bawah)."""
+    days = (dates - today).dt.days
+    return (days // 30).astype('Int64')
+
+
+def add_demographics(df, today=None):
+    """Tambahkan kolom Usia, Generasi, dan Bulan Menuju Pensiun ke `df`."""
+    if 'Tanggal Lahir' not in df.columns:
+        return df
+    if today is None:
+        today = pd.Timestamp(datetime.now().date())
+
+    dob = df['Tanggal Lahir']
+    df['Usia'] = compute_age(dob, today)
+    df['Generasi'] = classify_generation(dob, today.year)
+    df['Bulan Menuju Pensiun'] = months_until(add_years(dob, RETIREMENT_AGE), today)
+    return df
+
+
+def add_employment_columns(df, today=None):
+    """Tambahkan kolom Masa Kerja (tahun) dan Bulan Menuju Resign ke `df`."""
+    if today is None:
+        today = pd.Timestamp(datetime.now().date())
+
+    if 'Tanggal Masuk' in df.columns:
+        df['Masa Kerja'] = (today - df['Tanggal Masuk']).dt.days / 365.25
+    if 'Tanggal Resign' in df.columns:
+        df['Bulan Menuju Resign'] = months_until(df['Tanggal Resign'], today)
+    return df
@@ -0,0 +1,153 @@
+"""Ekspor data hasil filter ke CSV, XLSX, atau Parquet.
+
+File hanya dibuat saat tombol download ditekan, ditulis per potongan
+(`CHUNK_ROWS` baris) langsung ke disk sehingga memori puncak tidak
+bergantung pada jumlah baris, lalu disimpan di direktori cache dengan
+kunci versi dataset + state filter. Permintaan berikutnya untuk state
+yang sama (dari sesi mana pun) cukup membaca file yang sudah ada.
+"""
+import os
+import threading
+
+import numpy as np
+
+from engine.metrics import METRICS
+
+CHUNK_ROWS = 50_000
+MAX_CACHED_EXPORTS = 16
+XLSX_MAX_ROWS = 1_048_575  # batas baris Excel dikurangi baris header
+
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'XLSX': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+DEFAULT_EXPORT_DIR = os.environ.get(
+    'DASHBOARD_EXPORT_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.export')
+)
+
+
+def iter_chunks(view, chunk_rows=CHUNK_ROWS):
+    """Potongan DataFrame berurutan dari DataView (atau DataFrame)."""
+    base = getattr(view, 'base', view)
+    rows = getattr(view, 'rows', None)
+    if rows is None:
+        rows = np.arange(len(base))
+    for start in range(0, max(len(rows), 1), chunk_rows):
+        yield base.take(rows[start:start + chunk_rows])
+
+
+def write_csv(view, path, chunk_rows=CHUNK_ROWS):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for i, chunk in enumerate(iter_chunks(view, chunk_rows)):
+            chunk.to_csv(f, index=False, header=(i == 0))
+
+
+def write_parquet(view, path, chunk_rows=CHUNK_ROWS):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in iter_chunks(view, chunk_rows):
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _xlsx_rows(view, chunk_rows):
+    for chunk in iter_chunks(view, chunk_rows):
+        values = chunk.astype(object).where(chunk.notna(), None)
+        yield from values.itertuples(index=False, name=None)
+
+
+def write_xlsx(view, path, chunk_rows=CHUNK_ROWS):
+    """XLSX baris demi baris: xlsxwriter (constant_memory) bila ada, jika tidak openpyxl write-only."""
+    if len(view) > XLSX_MAX_ROWS:
+        raise ValueError(f"XLSX maksimal {XLSX_MAX_ROWS:,} baris; gunakan CSV atau Parquet.")
+    header = [str(col) for col in view.columns]
+
+    try:
+        import xlsxwriter
+    except ImportError:
+        xlsxwriter = None
+
+    if xlsxwriter is not None:
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd'})
+        sheet = workbook.add_worksheet('Data')
+        sheet.write_row(0, 0, header)
+        for i, row in enumerate(_xlsx_rows(view, chunk_rows), start=1):
+            sheet.write_row(i, 0, row)
+        workbook.close()
+        return
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Data')
+    sheet.append(header)
+    for row in _xlsx_rows(view, chunk_rows):
+        sheet.append(row)
+    workbook.save(path)
+
+
+WRITERS = {'CSV': write_csv, 'XLSX': write_xlsx, 'Parquet': write_parquet}
+
+
+class ExportCache:
+    """File ekspor di disk per (kunci, format), dibuang yang paling lama bila penuh."""
+
+    def __init__(self, directory=DEFAULT_EXPORT_DIR, max_files=MAX_CACHED_EXPORTS):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def path(self, key, fmt):
+        extension, _ = EXPORT_FORMATS[fmt]
+        return os.path.join(self.directory, f'{key}.{extension}')
+
+    def export(self, view, fmt, key):
+        """Path file ekspor `view` dalam format `fmt`; dibuat bila belum ada."""
+        path = self.path(key, fmt)
+        METRICS.cache_lookup('export')
+        with self._lock:
+            if os.path.exists(path):
+                os.utime(path)
+                return path
+            METRICS.cache_miss('export')
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            try:
+                with METRICS.span(f'export.{fmt.lower()}') as s:
+                    WRITERS[fmt](view, tmp_path)
+                    s.rows, s.bytes = len(view), os.path.getsize(tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self._prune()
+        return path
+
+    def read(self, view, fmt, key):
+        with open(self.export(view, fmt, key), 'rb') as f:
+            return f.read()
+
+    def _prune(self):
+        files = [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if not name.endswith('.tmp')
+        ]
+        files.sort(key=os.path.getmtime)
+        for path in files[:-self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
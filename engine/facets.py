@@ -0,0 +1,108 @@
+"""Hitungan facet dashboard dalam satu lintasan.
+
+Semua distribusi yang dipakai chart (status, jenis kelamin, band level,
+unit kerja, kelas kapal, segmen, generasi, serta klasifikasi jabatan dan
+pendidikan per penempatan Laut/Darat) dihitung sekaligus dengan
+`np.bincount` atas kode kategori, lalu dibungkus dalam `FacetResult`.
+Pecahan per penempatan adalah tabel silang kode × `Penempatan` yang
+dihitung dengan satu bincount.
+"""
+import numpy as np
+import pandas as pd
+
+from engine.cleaning import PLACEMENT_COLUMN, PLACEMENTS, classify_placement
+
+FACET_COLUMNS = [
+    'Status Kepegawaian', 'Jenis Kelamin', 'Band Level', 'Unit Kerja',
+    'Kelas Kapal', 'Segmen', 'Generasi',
+]
+
+# Kolom yang dipecah per penempatan (kolom Penempatan)
+SPLIT_COLUMNS = ['Klasifikasi Jabatan', 'Tingkat Pendidikan']
+
+
+class FacetResult:
+    """Hasil hitung semua facet untuk satu frame karyawan aktif."""
+
+    def __init__(self, total, counts, split_totals, split_counts):
+        self.total = total
+        self.split_totals = split_totals
+        self._counts = counts
+        self._split_counts = split_counts
+
+    def __contains__(self, col):
+        return col in self._counts
+
+    def counts(self, col):
+        """Jumlah per nilai `col`, terurut menurun, tanpa nilai berjumlah nol."""
+        return self._counts.get(col, _empty_counts(col))
+
+    def split_counts(self, placement, col):
+        """Seperti `counts`, tetapi hanya untuk penempatan `placement`."""
+        return self._split_counts.get((placement, col), _empty_counts(col))
+
+
+def _empty_counts(col):
+    return pd.Series([], dtype='int64', index=pd.Index([], name=col), name='count')
+
+
+def _as_codes(series):
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    return series.cat.codes.to_numpy(), series.cat.categories
+
+
+def _to_counts(counts, categories, col):
+    result = pd.Series(counts, index=pd.Index(categories, name=col), name='count')
+    return result[result > 0].sort_values(ascending=False, kind='stable')
+
+
+def _bincount(codes, categories, col):
+    return _to_counts(np.bincount(codes[codes >= 0], minlength=len(categories)), categories, col)
+
+
+def placement_codes(df):
+    """Kode Penempatan per baris (indeks ke PLACEMENTS, -1 = tidak diketahui), atau None."""
+    if PLACEMENT_COLUMN in df.columns:
+        placement = df[PLACEMENT_COLUMN]
+    elif 'Jenis' in df.columns:
+        placement = classify_placement(df['Jenis'])
+    else:
+        return None
+    codes, categories = _as_codes(placement)
+    # Petakan urutan kategori kolom ke urutan PLACEMENTS
+    lookup = np.append(np.asarray(pd.Index(PLACEMENTS).get_indexer(categories)), -1)
+    return lookup[codes]
+
+
+def crosstab(codes, n_categories, place_codes):
+    """Tabel silang (len(PLACEMENTS) × n_categories) dalam satu bincount."""
+    valid = (codes >= 0) & (place_codes >= 0)
+    flat = place_codes[valid].astype(np.int64) * n_categories + codes[valid]
+    counts = np.bincount(flat, minlength=len(PLACEMENTS) * n_categories)
+    return counts.reshape(len(PLACEMENTS), n_categories)
+
+
+def compute_facets(df, columns=FACET_COLUMNS, split_columns=SPLIT_COLUMNS):
+    """Hitung semua facet dari `df` (sudah difilter dan hanya karyawan aktif)."""
+    counts = {}
+    for col in columns:
+        if col in df.columns:
+            codes, categories = _as_codes(df[col])
+            counts[col] = _bincount(codes, categories, col)
+
+    split_totals = {placement: 0 for placement in PLACEMENTS}
+    split_counts = {}
+    place_codes = placement_codes(df)
+    if place_codes is not None:
+        totals = np.bincount(place_codes[place_codes >= 0], minlength=len(PLACEMENTS))
+        split_totals = dict(zip(PLACEMENTS, totals.tolist()))
+        for col in split_columns:
+            if col not in df.columns:
+                continue
+            codes, categories = _as_codes(df[col])
+            table = crosstab(codes, len(categories), place_codes)
+            for i, placement in enumerate(PLACEMENTS):
+                split_counts[(placement, col)] = _to_counts(table[i], categories, col)
+
+    return FacetResult(len(df), counts, split_totals, split_counts)
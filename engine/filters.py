@@ -0,0 +1,107 @@
+"""Indeks filter untuk multiselect sidebar.
+
+Setiap kolom filter disimpan sekali sebagai array kode (hasil factorize).
+Memilih beberapa nilai dalam satu kolom cukup satu gather lewat tabel
+lookup boolean (OR antar nilai), antar kolom di-AND, dan baris diambil
+sekali di akhir. Tidak ada lagi `astype(str)` maupun salinan DataFrame per
+filter.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Kolom multiselect sidebar, sesuai urutan tampil
+FILTER_COLUMNS = (
+    'Status Kepegawaian', 'Unit Kerja',
+    'Klasifikasi Jabatan', 'Jabatan', 'Lokasi Kerja',
+    'Sub Unit Kerja', 'Jenis', 'Department Name',
+)
+DATE_FILTER_COLUMN = 'Tanggal Masuk'
+
+
+class FilterIndex:
+    """Kode kategori per kolom filter beserta rentang Tanggal Masuk."""
+
+    def __init__(self, df, columns=FILTER_COLUMNS, date_col=DATE_FILTER_COLUMN):
+        self.n_rows = len(df)
+        self.options = {}
+        self._codes = {}
+        self._n_codes = {}
+        self._lookup = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col])
+            lookup = {}
+            # Nilai berbeda dengan teks yang sama (mis. 1 dan '1') digabung
+            for code, value in enumerate(uniques):
+                lookup.setdefault(str(value), []).append(code)
+            self._codes[col] = codes
+            self._n_codes[col] = len(uniques)
+            self._lookup[col] = lookup
+            self.options[col] = sorted(lookup)
+
+        self._dates = None
+        if date_col in df.columns:
+            self._dates = df[date_col].to_numpy(dtype='datetime64[ns]')
+
+    def column_mask(self, col, selected_values):
+        """Mask baris yang nilai `col`-nya termasuk salah satu `selected_values`."""
+        lookup = self._lookup[col]
+        # Slot terakhir untuk kode -1 (NaN) yang tidak pernah cocok
+        lut = np.zeros(self._n_codes[col] + 1, dtype=bool)
+        for value in selected_values:
+            for code in lookup.get(value, ()):
+                lut[code] = True
+        return lut[self._codes[col]]
+
+    def date_mask(self, start, end):
+        dates = self._dates
+        return (dates >= np.datetime64(start, 'ns')) & (dates <= np.datetime64(end, 'ns'))
+
+    def mask(self, selections, date_range=None):
+        """AND dari semua filter aktif; `selections` = {kolom: [nilai, ...]}."""
+        mask = np.ones(self.n_rows, dtype=bool)
+        if date_range is not None and self._dates is not None:
+            mask &= self.date_mask(*date_range)
+        for col, selected_values in selections.items():
+            if selected_values and col in self._codes:
+                mask &= self.column_mask(col, selected_values)
+        return mask
+
+    def rows(self, selections, date_range=None):
+        """Posisi baris yang lolos semua filter, atau None bila tidak ada filter aktif."""
+        if date_range is None and not any(selections.values()):
+            return None
+        return np.flatnonzero(self.mask(selections, date_range))
+
+
+def entry_date_bounds(df, today, date_col=DATE_FILTER_COLUMN):
+    """Rentang tanggal yang boleh dipilih: Tanggal Masuk valid paling awal s.d. hari ini."""
+    if date_col not in df.columns:
+        return None
+    dates = df[date_col]
+    valid = dates[dates.notna() & (dates <= today)]
+    if valid.empty:
+        return None
+    return valid.min().date(), pd.Timestamp(today).date()
+
+
+def resolve_date_range(applied_range, bounds):
+    """Rentang filter tanggal sebagai Timestamp; default seluruh `bounds`."""
+    if bounds is None:
+        return None
+    start, end = applied_range or bounds
+    return pd.to_datetime(start), pd.to_datetime(end)
+
+
+def filter_state_key(selections, date_range=None):
+    """Kunci kanonik state filter: rentang tanggal + pilihan yang diurutkan."""
+    items = tuple(sorted(
+        (col, tuple(sorted(values))) for col, values in selections.items() if values
+    ))
+    dates = None
+    if date_range is not None:
+        dates = tuple(pd.Timestamp(d).strftime('%Y-%m-%d') for d in date_range)
+    return hashlib.sha1(repr((dates, items)).encode('utf-8')).hexdigest()
@@ -0,0 +1,91 @@
+"""Gazetteer pelabuhan: indeks `Nama Pelabuhan` -> koordinat, provinsi, pulau.
+
+File GeoJSON lokal dibaca lebih dulu; URL GitHub hanya dipakai bila file
+tidak ada. Hasil parse disimpan sekali per proses dan baru dibaca ulang bila
+mtime file (atau ETag dari server) berubah.
+"""
+import json
+import os
+import threading
+import time
+
+from engine.metrics import span
+
+GEOJSON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_pelabuhan.geojson')
+GEOJSON_URL = 'https://raw.githubusercontent.com/naufalhajid/Dashboard-Ferizyan/refs/heads/main/data_pelabuhan.geojson'
+NAME_KEY = 'Nama Pelabuhan'
+
+# Jeda minimum antar revalidasi ETag ke URL (detik)
+URL_REVALIDATE_SECONDS = 3600
+
+_lock = threading.Lock()
+_cache = {'key': None, 'index': None, 'etag': None, 'checked_at': 0.0}
+
+
+def build_port_index(geojson_data):
+    """Ubah FeatureCollection menjadi dict nama pelabuhan -> info lokasi.
+
+    Nama yang muncul lebih dari sekali (mis. dua dermaga BAKAUHENI) disimpan
+    sebagai beberapa titik pada `coordinates`.
+    """
+    index = {}
+    for feature in geojson_data.get('features', []):
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') != 'Point':
+            continue
+        props = feature.get('properties', {})
+        name = props.get(NAME_KEY, 'Unknown')
+        lon, lat = geometry['coordinates'][:2]
+        entry = index.setdefault(name, {
+            'provinsi': props.get('provinsi'),
+            'pulau': props.get('pulau'),
+            'coordinates': [],
+        })
+        entry['coordinates'].append((lat, lon))
+    return index
+
+
+def _load_from_url(url, timeout):
+    import requests
+
+    now = time.monotonic()
+    if _cache['key'] == ('url', url) and now - _cache['checked_at'] < URL_REVALIDATE_SECONDS:
+        return _cache['index']
+
+    headers = {}
+    if _cache['key'] == ('url', url) and _cache['etag']:
+        headers['If-None-Match'] = _cache['etag']
+    with span('gazetteer.fetch') as s:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        s.bytes = len(response.content)
+    if response.status_code == 304:
+        _cache['checked_at'] = now
+        return _cache['index']
+    response.raise_for_status()
+
+    _cache.update(
+        key=('url', url),
+        index=build_port_index(response.json()),
+        etag=response.headers.get('ETag'),
+        checked_at=now,
+    )
+    return _cache['index']
+
+
+def load_port_index(path=GEOJSON_PATH, url=GEOJSON_URL, timeout=10):
+    """Ambil indeks pelabuhan, dari file lokal bila ada, selain itu dari URL."""
+    with _lock:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime is None:
+            return _load_from_url(url, timeout)
+
+        key = ('file', path, mtime)
+        if _cache['key'] != key:
+            with span('gazetteer.load') as s, open(path, encoding='utf-8') as fh:
+                index = build_port_index(json.load(fh))
+                s.rows, s.bytes = len(index), os.path.getsize(path)
+            _cache.update(key=key, index=index, etag=None, checked_at=time.monotonic())
+        return _cache['index']
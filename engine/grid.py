@@ -0,0 +1,122 @@
+"""Tabel data berhalaman (paginated) yang dihitung di server.
+
+Sort, pencarian teks, dan pemotongan halaman dilakukan atas posisi baris;
+hanya baris di halaman yang sedang dilihat yang dimaterialisasi dan
+dikirim ke browser. Urutan sort per kolom dihitung sekali per dataset
+atas frame dasar, lalu dipersempit ke baris view dengan satu gather,
+sehingga mengganti filter tidak memicu sort ulang.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from engine.metrics import METRICS
+
+DEFAULT_PAGE_SIZE = 50
+PAGE_SIZES = [25, 50, 100, 250]
+MAX_CACHED_SEARCHES = 16
+
+
+def _is_text(series):
+    return (
+        isinstance(series.dtype, pd.CategoricalDtype)
+        or pd.api.types.is_object_dtype(series.dtype)
+        or pd.api.types.is_string_dtype(series.dtype)
+    )
+
+
+def _sort_keys(series):
+    """Kunci sort (peringkat integer) per baris, dan kunci untuk NaN (terbesar)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        rank = np.empty(len(categories) + 1, dtype=np.int64)
+        rank[np.argsort(categories.astype(str), kind='stable')] = np.arange(len(categories))
+        rank[-1] = len(categories)
+        return rank[series.cat.codes.to_numpy()], len(categories)
+    try:
+        codes, uniques = pd.factorize(series, sort=True)
+    except TypeError:
+        # Kolom object bercampur tipe: urutkan sebagai teks
+        codes, uniques = pd.factorize(series.where(series.isna(), series.astype(str)), sort=True)
+    return np.where(codes < 0, len(uniques), codes), len(uniques)
+
+
+class GridIndex:
+    """Urutan sort dan hasil pencarian teks atas satu frame dasar."""
+
+    def __init__(self, base):
+        self.base = base
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._searches = OrderedDict()
+
+    def _sort_key(self, col):
+        entry = self._keys.get(col)
+        if entry is None:
+            entry = _sort_keys(self.base[col])
+            with self._lock:
+                self._keys[col] = entry
+        return entry
+
+    def sort_rows(self, rows, col, ascending=True):
+        """`rows` diurutkan menurut `col`; NaN di akhir untuk kedua arah."""
+        keys, na_key = self._sort_key(col)
+        if rows is None:
+            rows = np.arange(len(self.base))
+        view_keys = keys[rows]
+        if not ascending:
+            # Balik urutan tanpa memindahkan NaN ke depan
+            view_keys = np.where(view_keys == na_key, na_key, na_key - 1 - view_keys)
+        return rows[np.argsort(view_keys, kind='stable')]
+
+    def search_mask(self, query):
+        """Mask baris frame dasar yang salah satu kolom teksnya memuat `query`."""
+        query = query.strip().lower()
+        METRICS.cache_lookup('grid_search')
+        with self._lock:
+            if query in self._searches:
+                self._searches.move_to_end(query)
+                return self._searches[query]
+        METRICS.cache_miss('grid_search')
+
+        mask = np.zeros(len(self.base), dtype=bool)
+        for col in self.base.columns:
+            series = self.base[col]
+            if not _is_text(series):
+                continue
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Cocokkan per kategori, lalu gather lewat kode (slot terakhir = NaN)
+                categories = series.cat.categories.astype(str).str.lower()
+                lut = np.append(np.asarray(categories.str.contains(query, regex=False), dtype=bool), False)
+                mask |= lut[series.cat.codes.to_numpy()]
+            else:
+                found = series.astype(str).str.lower().str.contains(query, regex=False)
+                mask |= found.to_numpy(dtype=bool, na_value=False) & series.notna().to_numpy()
+
+        with self._lock:
+            self._searches[query] = mask
+            while len(self._searches) > MAX_CACHED_SEARCHES:
+                self._searches.popitem(last=False)
+        return mask
+
+    def query(self, rows=None, search='', sort_col=None, ascending=True):
+        """Posisi baris (di frame dasar) setelah pencarian dan sort."""
+        if search.strip():
+            mask = self.search_mask(search)
+            rows = np.flatnonzero(mask) if rows is None else rows[mask[rows]]
+        if sort_col is not None:
+            rows = self.sort_rows(rows, sort_col, ascending)
+        if rows is None:
+            rows = np.arange(len(self.base))
+        return rows
+
+    def page(self, rows, page=1, page_size=DEFAULT_PAGE_SIZE):
+        """Materialisasi satu halaman (nomor mulai dari 1) dari `rows`."""
+        start = (page - 1) * page_size
+        return self.base.take(rows[start:start + page_size])
+
+
+def page_count(n_rows, page_size=DEFAULT_PAGE_SIZE):
+    return max(1, -(-n_rows // page_size))
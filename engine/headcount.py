@@ -0,0 +1,65 @@
+"""Headcount karyawan aktif sepanjang waktu dari aliran event masuk/keluar.
+
+Setiap karyawan menyumbang satu event masuk (+1) dan satu event keluar (-1)
+dari `ActiveIntervalIndex`, yang menyimpan kedua aliran terurut sekali per
+dataset, sehingga headcount pada tanggal mana pun cukup dua binary search:
+jumlah yang sudah masuk dikurangi jumlah yang sudah keluar. Subset hasil
+filter sidebar diambil dengan mask atas urutan yang sama, tanpa sort ulang.
+"""
+import numpy as np
+import pandas as pd
+
+from engine.active import NEVER, _ns
+
+# Rentang default grafik tren (tahun ke belakang dari hari ini)
+TREND_YEARS = 10
+
+
+def previous_period_end(now=None):
+    """Akhir bulan lalu, titik pembanding KPI "vs periode lalu" (headcount)."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    return now.to_period('M').to_timestamp() - pd.Timedelta(days=1)
+
+
+def month_ends(start, end):
+    """Akhir setiap bulan dari `start` s.d. `end`; titik terakhir adalah `end`."""
+    end = pd.Timestamp(end)
+    dates = pd.period_range(start, end, freq='M').to_timestamp(how='end').normalize()
+    return dates[:-1].append(pd.DatetimeIndex([end]))
+
+
+class HeadcountIndex:
+    """Deret headcount di atas `ActiveIntervalIndex` satu dataset."""
+
+    def __init__(self, intervals):
+        self.intervals = intervals
+        self.today = intervals.today
+
+    def _events(self, rows):
+        intervals = self.intervals
+        if rows is None:
+            return intervals.starts, intervals.ends
+        selected = np.zeros(intervals.n_rows, dtype=bool)
+        selected[rows] = True
+        return (intervals.starts[selected[intervals.start_order]],
+                intervals.ends[selected[intervals.end_order]])
+
+    def headcount(self, dates, rows=None):
+        """Jumlah karyawan aktif pada tiap tanggal `dates` (subset `rows` bila ada)."""
+        starts, ends = self._events(rows)
+        points = _ns(dates)
+        return np.searchsorted(starts, points, side='right') - np.searchsorted(ends, points, side='right')
+
+    def at(self, date, rows=None):
+        return int(self.headcount([pd.Timestamp(date)], rows)[0])
+
+    def monthly(self, rows=None, start=None, end=None):
+        """Headcount di akhir setiap bulan, sebagai Series berindeks tanggal."""
+        end = self.today if end is None else pd.Timestamp(end)
+        if start is None:
+            start = end - pd.DateOffset(years=TREND_YEARS)
+            starts, _ = self._events(rows)
+            if len(starts) and starts[0] != NEVER:
+                start = max(start, pd.Timestamp(starts[0]))
+        dates = month_ends(start, end)
+        return pd.Series(self.headcount(dates, rows), index=pd.Index(dates, name='Bulan'), name='Jumlah')
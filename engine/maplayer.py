@@ -0,0 +1,178 @@
+"""Layer render peta sebaran karyawan.
+
+HTML peta folium di-memo per agregat lokasi, sehingga rerun dengan
+`lokasi_counts` yang sama tidak membangun dan menserialisasi ulang peta.
+Untuk agregat baru, halaman disusun dari kerangka peta (dirender sekali per
+proses) ditambah script JS per pelabuhan. Script itu di-memo per (nama,
+jumlah, laut, darat, koordinat), jadi hanya marker pelabuhan yang angkanya
+berubah yang dibangun dan diserialisasi ulang lewat folium.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from engine.metrics import METRICS
+
+MAP_CENTER = [-2.5, 118.0]
+MAP_ZOOM = 5
+MAX_CACHED_MAPS = 32
+MAX_CACHED_MARKERS = 4096
+MARKERS_PLACEHOLDER = '/*__DASHBOARD_MARKERS__*/'
+
+_lock = threading.Lock()
+_map_cache = OrderedDict()
+_marker_cache = OrderedDict()
+
+
+def create_map_popup_html(name, jumlah, laut, darat):
+    return f"""
+    <div style="font-family: 'Segoe UI', sans-serif; min-width: 280px; padding: 10px; background: #fff; border-radius: 10px; box-shadow: 0 2px 5px rgba(0,0,0,0.2);">
+        <h4 style="margin: 0 0 10px 0; color: #2a5298; border-bottom: 2px solid #667eea; padding-bottom: 5px;">📍 {name}</h4>
+        <div style="font-size: 14px;">
+            <p style="margin: 5px 0;"><strong>👥 Total Karyawan:</strong> <span style="float: right; font-weight: bold;">{jumlah}</span></p>
+            <p style="margin: 5px 0;"><strong>🚢 Penempatan Laut:</strong> <span style="float: right; font-weight: bold;">{laut}</span></p>
+            <p style="margin: 5px 0;"><strong>🏢 Penempatan Darat:</strong> <span style="float: right; font-weight: bold;">{darat}</span></p>
+        </div>
+    </div>
+    """
+
+
+def get_marker_style(count):
+    if count > 50: return 'red', 'star'
+    if count > 20: return 'orange', 'info-sign'
+    if count > 0: return 'blue', 'user'
+    return 'gray', 'map-marker'
+
+
+@lru_cache(maxsize=4096)
+def marker_fragment(name, jumlah, laut, darat):
+    """Popup, tooltip, warna dan ikon marker untuk satu pelabuhan."""
+    color, icon = get_marker_style(jumlah)
+    popup_html = create_map_popup_html(name, jumlah, laut, darat)
+    return popup_html, f"{name} ({jumlah} karyawan)", color, icon
+
+
+def map_markers(lokasi_counts, location_col, port_index):
+    """Ambil baris agregat yang punya titik di gazetteer sebagai tuple marker."""
+    markers = []
+    for row in lokasi_counts.to_dict('records'):
+        name = row[location_col]
+        jumlah = int(row.get('Jumlah Karyawan', 0))
+        if jumlah > 0 and name in port_index:
+            markers.append((name, jumlah, int(row.get('Laut', 0)), int(row.get('Darat', 0))))
+    markers.sort()
+    return tuple(markers)
+
+
+def aggregate_key(markers):
+    """Hash stabil dari daftar marker, dipakai sebagai kunci cache peta."""
+    return hashlib.sha1(repr(markers).encode('utf-8')).hexdigest()
+
+
+def _new_map():
+    import folium
+
+    return folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM, tiles='OpenStreetMap')
+
+
+def _element_names(element):
+    names = {element.get_name()}
+    for child in element._children.values():
+        names |= _element_names(child)
+    return names
+
+
+@lru_cache(maxsize=1)
+def map_shell():
+    """(HTML peta tanpa marker dengan penanda sisipan, nama variabel JS peta)."""
+    from branca.element import MacroElement, Template
+
+    m = _new_map()
+    slot = MacroElement()
+    slot._template = Template('{% macro script(this, kwargs) %}' + MARKERS_PLACEHOLDER + '{% endmacro %}')
+    slot.add_to(m)
+    return m.get_root().render(), m.get_name()
+
+
+def _render_marker_scripts(ports, map_name):
+    """Script JS per pelabuhan, dirender folium dalam satu peta sementara."""
+    import folium
+
+    m = _new_map()
+    port_markers = []
+    for name, jumlah, laut, darat, coordinates in ports:
+        popup_html, tooltip, color, icon = marker_fragment(name, jumlah, laut, darat)
+        port_markers.append([
+            folium.Marker(
+                location=[lat, lon],
+                popup=folium.Popup(popup_html, max_width=300),
+                tooltip=tooltip,
+                icon=folium.Icon(color=color, icon=icon, prefix='glyphicon')
+            ).add_to(m)
+            for lat, lon in coordinates
+        ])
+    figure = m.get_root()
+    figure.render()
+
+    scripts = figure.script._children
+    result = []
+    for markers in port_markers:
+        names = set().union(*(_element_names(marker) for marker in markers))
+        script = '\n'.join(element.render() for key, element in scripts.items() if key in names)
+        result.append(script.replace(m.get_name(), map_name))
+    return result
+
+
+def marker_scripts(ports):
+    """Script JS untuk tiap (nama, jumlah, laut, darat, koordinat); hanya yang belum ada yang dirender."""
+    _, map_name = map_shell()
+    with _lock:
+        cached = [_marker_cache.get(port) for port in ports]
+        for port, script in zip(ports, cached):
+            if script is not None:
+                _marker_cache.move_to_end(port)
+    missing = [port for port, script in zip(ports, cached) if script is None]
+    METRICS.cache_lookup('map_markers')
+    if not missing:
+        return cached
+
+    METRICS.cache_miss('map_markers')
+    rendered = dict(zip(missing, _render_marker_scripts(missing, map_name)))
+    with _lock:
+        _marker_cache.update(rendered)
+        while len(_marker_cache) > MAX_CACHED_MARKERS:
+            _marker_cache.popitem(last=False)
+    return [script if script is not None else rendered[port] for port, script in zip(ports, cached)]
+
+
+def _build_map_html(markers, port_index):
+    shell, _ = map_shell()
+    ports = [
+        (name, jumlah, laut, darat, tuple(tuple(point) for point in port_index[name]['coordinates']))
+        for name, jumlah, laut, darat in markers
+    ]
+    return shell.replace(MARKERS_PLACEHOLDER, '\n'.join(marker_scripts(ports)), 1)
+
+
+def render_map_html(markers, port_index):
+    """HTML peta untuk daftar marker; dibangun sekali per agregat berbeda."""
+    key = aggregate_key(markers)
+    METRICS.cache_lookup('map_html')
+    with _lock:
+        entry = _map_cache.get(key)
+        if entry is not None and entry[0] is port_index:
+            _map_cache.move_to_end(key)
+            return entry[1]
+
+    METRICS.cache_miss('map_html')
+    with METRICS.span('map.render') as s:
+        html = _build_map_html(markers, port_index)
+        s.rows, s.bytes = len(markers), len(html)
+
+    with _lock:
+        _map_cache[key] = (port_index, html)
+        _map_cache.move_to_end(key)
+        while len(_map_cache) > MAX_CACHED_MAPS:
+            _map_cache.popitem(last=False)
+    return html
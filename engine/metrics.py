@@ -0,0 +1,228 @@
+"""Instrumentasi ringan untuk jalur panas dashboard.
+
+`span(nama)` mengukur durasi satu tahap (baca sumber, cleaning, filter,
+agregat, peta, chart, ekspor) beserta baris dan byte yang diproses;
+`track_cache` menghitung lookup dan miss untuk fungsi yang di-cache.
+Semua angka dikumpulkan per proses di `METRICS` dan bisa dibaca sebagai
+dict (panel admin), teks Prometheus (`write_prometheus`, cocok untuk
+textfile collector), atau log JSON per span bila `DASHBOARD_METRICS_LOG`
+diset.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_FILE = os.environ.get('DASHBOARD_METRICS_FILE')
+METRICS_LOG = os.environ.get('DASHBOARD_METRICS_LOG')
+PREFIX = 'dashboard'
+
+
+class Span:
+    """Satu pengukuran; `rows` dan `bytes` boleh diisi di dalam blok `with`."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+        self.bytes = None
+        self.seconds = None
+
+
+class StageStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+
+    def add(self, span):
+        self.count += 1
+        self.seconds += span.seconds
+        self.max_seconds = max(self.max_seconds, span.seconds)
+        self.last_seconds = span.seconds
+        self.rows += span.rows or 0
+        self.bytes += span.bytes or 0
+
+
+class MetricsRegistry:
+    """Kumpulan span, counter cache, dan collector eksternal dalam satu proses."""
+
+    def __init__(self, log_path=METRICS_LOG):
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._lookups = {}
+        self._misses = {}
+        self._collectors = {}
+
+    @contextmanager
+    def span(self, name):
+        span = Span(name)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.seconds = time.perf_counter() - start
+            self.record(span)
+
+    def observe(self, name, seconds, rows=None, bytes=None):
+        """Catat durasi yang diukur sendiri oleh pemanggil."""
+        span = Span(name)
+        span.seconds, span.rows, span.bytes = seconds, rows, bytes
+        self.record(span)
+
+    def record(self, span):
+        with self._lock:
+            self._stages.setdefault(span.name, StageStats()).add(span)
+        if self.log_path:
+            self._log({
+                'ts': time.time(), 'stage': span.name, 'seconds': round(span.seconds, 6),
+                'rows': span.rows, 'bytes': span.bytes, 'pid': os.getpid(),
+            })
+
+    def _log(self, event):
+        line = json.dumps(event) + '\n'
+        with self._lock:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def cache_lookup(self, name):
+        with self._lock:
+            self._lookups[name] = self._lookups.get(name, 0) + 1
+
+    def cache_miss(self, name):
+        with self._lock:
+            self._misses[name] = self._misses.get(name, 0) + 1
+
+    def register_collector(self, name, collect):
+        """`collect()` mengembalikan dict angka, mis. `ResultCache.stats`."""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def stages(self):
+        with self._lock:
+            return {
+                name: {
+                    'count': s.count,
+                    'seconds': s.seconds,
+                    'avg_ms': s.seconds / s.count * 1000,
+                    'max_ms': s.max_seconds * 1000,
+                    'last_ms': s.last_seconds * 1000,
+                    'rows': s.rows,
+                    'bytes': s.bytes,
+                }
+                for name, s in self._stages.items()
+            }
+
+    def caches(self):
+        with self._lock:
+            lookups, misses = dict(self._lookups), dict(self._misses)
+            collectors = dict(self._collectors)
+        result = {}
+        for name in sorted(set(lookups) | set(misses)):
+            total, missed = lookups.get(name, 0), misses.get(name, 0)
+            result[name] = {
+                'hits': max(total - missed, 0),
+                'misses': missed,
+                'hit_rate': (total - missed) / total if total else 0.0,
+            }
+        for name, collect in collectors.items():
+            try:
+                result[name] = dict(collect())
+            except Exception:
+                continue
+        return result
+
+    def prometheus(self):
+        """Metrik dalam format teks eksposisi Prometheus."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+            for labels, value in samples:
+                label_text = ','.join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f'{PREFIX}_{name}{{{label_text}}} {value}')
+
+        stages = self.stages()
+        metric('stage_calls_total', 'counter', 'Jumlah eksekusi tahap.',
+               [({'stage': n}, s['count']) for n, s in stages.items()])
+        metric('stage_seconds_total', 'counter', 'Total durasi tahap (detik).',
+               [({'stage': n}, s['seconds']) for n, s in stages.items()])
+        metric('stage_seconds_max', 'gauge', 'Durasi terlama satu eksekusi tahap (detik).',
+               [({'stage': n}, s['max_ms'] / 1000) for n, s in stages.items()])
+        metric('stage_rows_total', 'counter', 'Baris yang diproses per tahap.',
+               [({'stage': n}, s['rows']) for n, s in stages.items()])
+        metric('stage_bytes_total', 'counter', 'Byte yang diproses per tahap.',
+               [({'stage': n}, s['bytes']) for n, s in stages.items()])
+
+        caches = self.caches()
+        for key in ('hits', 'misses', 'evictions', 'entries'):
+            samples = [({'cache': n}, c[key]) for n, c in caches.items() if key in c]
+            if samples:
+                kind = 'gauge' if key == 'entries' else 'counter'
+                suffix = '' if key == 'entries' else '_total'
+                metric(f'cache_{key}{suffix}', kind, f'Cache {key}.', samples)
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path=METRICS_FILE):
+        """Tulis `prometheus()` ke `path` secara atomik (tidak ada = tidak ditulis)."""
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._lookups.clear()
+            self._misses.clear()
+
+
+METRICS = MetricsRegistry()
+
+
+def span(name):
+    return METRICS.span(name)
+
+
+def frame_bytes(df):
+    """Ukuran buffer kolom (tanpa menelusuri objek string), murah untuk dipanggil."""
+    try:
+        return int(df.memory_usage(index=False, deep=False).sum())
+    except Exception:
+        return None
+
+
+def track_cache(name, cache_decorator, registry=None):
+    """Bungkus `cache_decorator` (mis. `st.cache_resource(...)`) dengan counter hit/miss.
+
+    Badan fungsi hanya berjalan saat miss, jadi miss dihitung (dan diukur
+    sebagai span `cache.<name>`) di dalamnya; setiap panggilan dihitung
+    sebagai lookup.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            metrics = registry or METRICS
+            metrics.cache_miss(name)
+            with metrics.span(f'cache.{name}'):
+                return fn(*args, **kwargs)
+
+        cached = cache_decorator(compute)
+
+        @functools.wraps(fn)
+        def lookup(*args, **kwargs):
+            (registry or METRICS).cache_lookup(name)
+            return cached(*args, **kwargs)
+
+        lookup.clear = getattr(cached, 'clear', None)
+        return lookup
+    return decorator
@@ -0,0 +1,60 @@
+"""Pipeline dashboard lengkap tanpa Streamlit.
+
+Urutan yang sama dengan app.py: data bersih -> filter sidebar -> karyawan
+aktif -> agregat (KPI, facet, tren, peta). Dipakai untuk batch job,
+benchmark, atau worker precompute; app.py memakai potongan yang sama
+tetapi meng-cache indeksnya per versi dataset.
+
+    sync = IncrementalSync(FileSource('Example Data.xlsx'))
+    result = run_dashboard(sync.refresh(), {'Unit Kerja': ['HO']})
+    result.aggregates.kpis().total
+"""
+from datetime import datetime
+
+import pandas as pd
+
+from engine.active import ActiveIntervalIndex
+from engine.aggregates import compute_aggregates
+from engine.filters import FilterIndex, entry_date_bounds, filter_state_key, resolve_date_range
+from engine.headcount import previous_period_end
+from engine.views import DataView
+
+
+class DashboardResult:
+    """Hasil satu state filter: view hasil filter, agregat, dan kuncinya."""
+
+    def __init__(self, view, aggregates, state_key, date_range, today):
+        self.view = view
+        self.aggregates = aggregates
+        self.state_key = state_key
+        self.date_range = date_range
+        self.today = today
+
+    @property
+    def active(self):
+        """View karyawan aktif hasil filter."""
+        return DataView(self.view.base, self.aggregates.active_rows)
+
+
+def run_dashboard(df, selections=None, date_range=None, today=None, previous_date=None,
+                  filter_index=None, intervals=None):
+    """Jalankan filter dan semua agregat untuk `df` (hasil cleaning).
+
+    `date_range` None berarti seluruh rentang Tanggal Masuk yang valid,
+    sama seperti default sidebar. Indeks yang sudah dibangun untuk `df`
+    boleh diberikan agar tidak dibangun ulang per pemanggilan.
+    """
+    if today is None:
+        today = pd.Timestamp(datetime.now().date())
+    if previous_date is None:
+        previous_date = previous_period_end()
+    selections = selections or {}
+    if filter_index is None:
+        filter_index = FilterIndex(df)
+    if intervals is None:
+        intervals = ActiveIntervalIndex(df, today)
+
+    date_range = resolve_date_range(date_range, entry_date_bounds(df, today))
+    view = DataView(df, filter_index.rows(selections, date_range))
+    aggregates = compute_aggregates(view, df, intervals, today, previous_date)
+    return DashboardResult(view, aggregates, filter_state_key(selections, date_range), date_range, today)
@@ -0,0 +1,43 @@
+"""Scheduler refresh data di background.
+
+Thread daemon yang memanggil `IncrementalSync.refresh_guarded()` setiap
+`interval` detik. Snapshot baru dipasang secara atomik oleh sync, jadi
+sesi yang sedang berjalan tetap dilayani versi sebelumnya sampai refresh
+selesai; latensi Google Sheets tidak pernah jatuh ke rerun pengguna.
+"""
+import threading
+
+
+class RefreshScheduler:
+    """Refresh `sync` secara berkala di thread terpisah."""
+
+    def __init__(self, sync, interval=3600):
+        self.sync = sync
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, run_immediately=False):
+        if self.running:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(run_immediately,), name='data-refresh-scheduler', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, run_immediately):
+        if run_immediately:
+            self.sync.refresh_guarded()
+        while not self._stop.wait(self.interval):
+            self.sync.refresh_guarded()
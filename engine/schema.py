@@ -0,0 +1,41 @@
+"""Skema kolom yang benar-benar dipakai dashboard.
+
+Hanya kolom di `DASHBOARD_COLUMNS` (dengan nama sesudah rename) yang
+dibaca dari sumber; kolom lain di sheet tidak pernah masuk ke pipeline
+rename, parsing tanggal, cleaning, hashing, maupun snapshot. Nama mentah
+yang perlu diminta ke sumber diturunkan dari `RENAME_MAP`, jadi sheet yang
+sudah memakai nama bersih maupun nama asli sama-sama terbaca.
+"""
+from engine.cleaning import DATE_COLUMNS, RENAME_MAP
+
+# Kolom yang dipakai filter, KPI, chart, peta, dan turunan demografi
+ANALYSIS_COLUMNS = [
+    'Status Kepegawaian', 'Unit Kerja', 'Sub Unit Kerja', 'Jenis', 'Kelas Kapal',
+    'Segmen', 'Jabatan', 'Jenis Kelamin', 'Band Level', 'Klasifikasi Jabatan',
+    'Department Name', 'Lokasi Kerja', 'Tingkat Pendidikan',
+    'Tanggal Lahir', 'Tanggal Masuk', 'Tanggal Keluar', 'Tanggal Pensiun', 'Tanggal Resign',
+]
+
+# Kolom identitas yang hanya ditampilkan di tabel dan ekspor
+DISPLAY_COLUMNS = ['NIK', 'ASDP.NIK', 'Nama']
+
+DASHBOARD_COLUMNS = DISPLAY_COLUMNS + ANALYSIS_COLUMNS
+
+# Kolom teks dibaca sebagai string agar tipe tidak ditebak per file/sel
+TEXT_COLUMNS = [col for col in DASHBOARD_COLUMNS if col not in DATE_COLUMNS and col != 'NIK']
+
+
+def raw_names(columns):
+    """Nama kolom di sumber untuk `columns`: nama bersih + nama asli dari RENAME_MAP."""
+    wanted = set(columns)
+    return list(columns) + [raw for raw, clean in RENAME_MAP.items() if clean in wanted]
+
+
+RAW_COLUMNS = raw_names(DASHBOARD_COLUMNS)
+RAW_DTYPES = {col: 'string' for col in raw_names(TEXT_COLUMNS)}
+
+
+def project_raw(df_raw, columns=RAW_COLUMNS):
+    """Ambil hanya kolom skema yang ada di `df_raw` (urutan asli dipertahankan)."""
+    wanted = set(columns)
+    return df_raw[[col for col in df_raw.columns if col in wanted]]
@@ -0,0 +1,66 @@
+"""Snapshot kolumnar (Arrow IPC) dari data yang sudah dibersihkan.
+
+File ditulis tanpa kompresi sehingga bisa di-memory-map: cold start cukup
+membaca snapshot terakhir tanpa menunggu sumber data dan tanpa cleaning
+ulang. Memory map hanya mempercepat pembacaan; `to_pandas()` menyalin
+isinya ke DataFrame milik proses itu sendiri, jadi setiap proses worker
+tetap memegang salinan datanya. Metadata menyimpan versi skema dan
+fingerprint sumber; snapshot dengan versi skema lain diabaikan.
+"""
+import json
+import os
+import time
+
+import pandas as pd
+
+# Naikkan setiap kali keluaran clean_data/add_demographics berubah bentuk
+SCHEMA_VERSION = 4
+
+ROW_HASH_COLUMN = '__row_hash'
+METADATA_KEY = b'dashboard'
+
+DEFAULT_SNAPSHOT_PATH = os.environ.get(
+    'DASHBOARD_SNAPSHOT_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.snapshot', 'karyawan.arrow')
+)
+
+
+def write_snapshot(path, cleaned, row_hashes, meta):
+    """Tulis snapshot secara atomik (file sementara lalu os.replace)."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(cleaned.assign(**{ROW_HASH_COLUMN: row_hashes}), preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps(
+        dict(meta, schema_version=SCHEMA_VERSION, written_at=time.time()),
+        default=str
+    ).encode('utf-8')
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    """Kembalikan (cleaned, row_hashes, meta), atau None bila tidak ada/tidak cocok."""
+    import pyarrow as pa
+
+    if not os.path.exists(path):
+        return None
+
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    raw_meta = (table.schema.metadata or {}).get(METADATA_KEY)
+    if raw_meta is None:
+        return None
+    meta = json.loads(raw_meta)
+    if meta.get('schema_version') != SCHEMA_VERSION:
+        return None
+
+    row_hashes = table.column(ROW_HASH_COLUMN).to_numpy()
+    cleaned = table.drop_columns([ROW_HASH_COLUMN]).to_pandas()
+    meta['today'] = pd.Timestamp(meta['today'])
+    return cleaned, row_hashes, meta
@@ -0,0 +1,208 @@
+"""Sumber data mentah karyawan.
+
+Setiap sumber cukup mengimplementasikan `read()` yang mengembalikan
+DataFrame mentah (nama kolom asli dari sheet), sehingga Google Sheets bisa
+diganti file lokal seperti `Example Data.xlsx` untuk pengujian.
+
+Sumber lokal mendukung proyeksi kolom (`columns`: kolom yang tidak
+disebut tidak pernah dibaca; kolom yang disebut tetapi tidak ada di file
+diabaikan; tabel SQL tanpa satu pun kolom yang disebut ditolak) dan dtype
+eksplisit (`dtype`), memakai reader tercepat yang tersedia: pyarrow untuk
+CSV/Parquet, calamine untuk XLSX bila terpasang.
+"""
+import os
+import sqlite3
+
+import pandas as pd
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+DUCKDB_EXTENSIONS = ('.duckdb',)
+DEFAULT_TABLE = 'karyawan'
+
+
+def _project(available, columns):
+    """Kolom `columns` yang memang ada, dalam urutan file; None = semua kolom."""
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return [col for col in available if col in wanted]
+
+
+def _quote_ident(ident):
+    """Kutip nama tabel/kolom untuk SQL (SQLite dan DuckDB)."""
+    return '"' + str(ident).replace('"', '""') + '"'
+
+
+def _dtypes_for(dtype, columns):
+    if dtype is None or columns is None:
+        return dtype
+    return {col: value for col, value in dtype.items() if col in columns}
+
+
+def _has_module(name):
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+class DataSource:
+    """Antarmuka sumber data mentah."""
+
+    name = 'source'
+
+    @property
+    def key(self):
+        """Identitas sumber (jenis + lokasi); snapshot dari sumber lain ditolak."""
+        return self.name
+
+    @property
+    def label(self):
+        """Nama sumber untuk ditampilkan ke pengguna."""
+        return self.name
+
+    def read(self):
+        raise NotImplementedError
+
+
+class GSheetsSource(DataSource):
+    """Google Sheets lewat `st.connection("gsheets", type=GSheetsConnection)`."""
+
+    name = 'gsheets'
+
+    def __init__(self, conn, spreadsheet_url, ttl=0, columns=None):
+        self.conn = conn
+        self.spreadsheet_url = spreadsheet_url
+        self.ttl = ttl
+        self.columns = columns
+
+    @property
+    def key(self):
+        return f'{self.name}:{self.spreadsheet_url}'
+
+    @property
+    def label(self):
+        return 'Google Sheets'
+
+    def read(self):
+        df = self.conn.read(spreadsheet=self.spreadsheet_url, ttl=self.ttl)
+        # Sheets selalu dikirim utuh; proyeksi dilakukan setelah dibaca
+        columns = _project(df.columns, self.columns)
+        return df if columns is None else df[columns]
+
+
+class FileSource(DataSource):
+    """File lokal CSV, XLSX, atau Parquet."""
+
+    name = 'file'
+
+    def __init__(self, path, columns=None, dtype=None, **read_kwargs):
+        self.path = path
+        self.columns = columns
+        self.dtype = dtype
+        self.read_kwargs = read_kwargs
+
+    @property
+    def key(self):
+        return f'{self.name}:{os.path.abspath(self.path)}'
+
+    @property
+    def label(self):
+        return os.path.basename(self.path)
+
+    def read(self):
+        ext = os.path.splitext(self.path)[1].lower()
+        if ext == '.csv':
+            return self._read_csv()
+        if ext in ('.xlsx', '.xls'):
+            return self._read_excel()
+        if ext in ('.parquet', '.pq'):
+            return self._read_parquet()
+        raise ValueError(f"Format file tidak didukung: {self.path}")
+
+    def _read_csv(self):
+        header = pd.read_csv(self.path, nrows=0, **self.read_kwargs).columns
+        columns = _project(header, self.columns)
+        kwargs = dict(self.read_kwargs, usecols=columns, dtype=_dtypes_for(self.dtype, columns))
+        if _has_module('pyarrow'):
+            kwargs.setdefault('engine', 'pyarrow')
+        return pd.read_csv(self.path, **kwargs)
+
+    def _read_excel(self):
+        kwargs = dict(self.read_kwargs)
+        if self.columns is not None:
+            wanted = set(self.columns)
+            kwargs['usecols'] = lambda col: col in wanted
+        if self.dtype is not None:
+            kwargs['dtype'] = self.dtype
+        if _has_module('python_calamine'):
+            kwargs.setdefault('engine', 'calamine')
+        return pd.read_excel(self.path, **kwargs)
+
+    def _read_parquet(self):
+        import pyarrow.parquet as pq
+
+        columns = _project(pq.read_schema(self.path).names, self.columns)
+        df = pd.read_parquet(self.path, columns=columns, **self.read_kwargs)
+        if self.dtype is not None:
+            df = df.astype(_dtypes_for(self.dtype, df.columns))
+        return df
+
+
+class SQLSource(DataSource):
+    """Tabel di database SQLite atau DuckDB lokal."""
+
+    name = 'sql'
+
+    def __init__(self, path, table=DEFAULT_TABLE, columns=None, dtype=None):
+        self.path = path
+        self.table = table
+        self.columns = columns
+        self.dtype = dtype
+
+    @property
+    def key(self):
+        return f'{self.name}:{os.path.abspath(self.path)}#{self.table}'
+
+    @property
+    def label(self):
+        return f'{os.path.basename(self.path)} (tabel {self.table})'
+
+    def _connect(self):
+        if self.path.lower().endswith(DUCKDB_EXTENSIONS):
+            import duckdb
+            return duckdb.connect(self.path, read_only=True)
+        return sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+
+    def read(self):
+        conn = self._connect()
+        try:
+            available = [
+                row[0] for row in
+                conn.execute(f'SELECT * FROM {_quote_ident(self.table)} LIMIT 0').description
+            ]
+            columns = _project(available, self.columns)
+            if columns is None:
+                columns = available
+            elif not columns:
+                raise ValueError(
+                    f"Tidak ada kolom yang diminta di tabel {self.table} ({self.path})"
+                )
+            query = f'SELECT {", ".join(map(_quote_ident, columns))} FROM {_quote_ident(self.table)}'
+            if self.path.lower().endswith(DUCKDB_EXTENSIONS):
+                df = conn.execute(query).df()
+            else:
+                df = pd.read_sql_query(query, conn)
+        finally:
+            conn.close()
+        if self.dtype is not None:
+            df = df.astype(_dtypes_for(self.dtype, df.columns))
+        return df
+
+
+def source_from_path(path, table=DEFAULT_TABLE, columns=None, dtype=None):
+    """Pilih sumber lokal berdasarkan ekstensi file."""
+    if path.lower().endswith(SQLITE_EXTENSIONS + DUCKDB_EXTENSIONS):
+        return SQLSource(path, table=table, columns=columns, dtype=dtype)
+    return FileSource(path, columns=columns, dtype=dtype)
@@ -0,0 +1,324 @@
+"""Sinkronisasi inkremental data sumber.
+
+Snapshot hasil cleaning terakhir disimpan bersama hash per baris data
+mentah. Saat refresh, baris yang hash-nya sudah dikenal memakai ulang hasil
+cleaning lama; hanya baris baru atau yang berubah yang dibersihkan ulang,
+lalu semuanya digabung kembali sesuai urutan sumber.
+
+Data mentah refresh sebelumnya juga disimpan di memori. Baris baru
+dicocokkan ke baris lama lewat `KEY_COLUMN` dan dibandingkan per kolom
+(operasi vektor); hanya baris yang berbeda yang di-hash ulang, karena
+hashing seluruh tabel jauh lebih mahal daripada perbandingan.
+
+Bila `snapshot_path` diberikan, setiap hasil sinkronisasi juga ditulis ke
+snapshot Arrow lokal, dan `restore()` memulihkannya saat cold start.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from engine.cleaning import clean_data, drop_empty_columns, fingerprint
+from engine.demographics import add_demographics, add_employment_columns
+from engine.metrics import frame_bytes, span
+from engine.snapshot import read_snapshot, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Kolom identitas baris mentah untuk mencocokkan data refresh sebelumnya
+KEY_COLUMN = 'NIK'
+# Jeda minimum (detik) sebelum refresh background dicoba lagi setelah gagal
+RETRY_INTERVAL = 300
+
+
+def clean_rows(df_raw, today):
+    """Pipeline cleaning per baris (tanpa membuang kolom kosong)."""
+    df = clean_data(df_raw, today=today, drop_empty=False)
+    df = add_demographics(df, today=today)
+    return add_employment_columns(df, today=today)
+
+
+def row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _take_rows(df, positions):
+    """`df.take(positions)`, tetapi slice tanpa salin bila posisinya berurutan."""
+    if len(positions) and positions[-1] - positions[0] == len(positions) - 1 \
+            and (np.diff(positions) == 1).all():
+        return df.iloc[positions[0]:positions[-1] + 1]
+    return df.take(positions)
+
+
+def unchanged_rows(df_raw, previous, key=KEY_COLUMN):
+    """Posisi baris `previous` yang identik dengan tiap baris `df_raw` (-1 = baru/berubah).
+
+    Baris dicocokkan lewat `key` lalu dibandingkan per kolom; None bila
+    kolom/dtype berbeda atau `key` tidak ada (semua baris harus di-hash).
+    """
+    if (
+        previous is None or key not in df_raw.columns
+        or list(previous.columns) != list(df_raw.columns)
+        or not previous.dtypes.equals(df_raw.dtypes)
+    ):
+        return None
+
+    old_keys = pd.Index(previous[key])
+    first = ~old_keys.duplicated() & old_keys.notna()
+    lookup = pd.Series(np.flatnonzero(first), index=old_keys[first])
+    old_pos = lookup.reindex(df_raw[key].to_numpy()).fillna(-1).to_numpy(dtype=np.int64, copy=True)
+
+    matched = np.flatnonzero(old_pos >= 0)
+    same = np.ones(len(matched), dtype=bool)
+    new_rows = _take_rows(df_raw, matched)
+    old_rows = _take_rows(previous, old_pos[matched])
+    for col in df_raw.columns:
+        new = new_rows[col].reset_index(drop=True)
+        old = old_rows[col].reset_index(drop=True)
+        same &= (new == old).fillna(False).to_numpy(dtype=bool) | (new.isna() & old.isna()).to_numpy()
+    old_pos[matched[~same]] = -1
+    return old_pos
+
+
+def incremental_hashes(df_raw, previous, previous_hashes):
+    """`row_hashes(df_raw)`, memakai ulang hash lama untuk baris yang tidak berubah."""
+    old_pos = unchanged_rows(df_raw, previous)
+    if old_pos is None:
+        return row_hashes(df_raw)
+    changed = np.flatnonzero(old_pos < 0)
+    hashes = previous_hashes.take(np.maximum(old_pos, 0))
+    if len(changed):
+        hashes[changed] = row_hashes(df_raw.take(changed))
+    return hashes
+
+
+def concat_aligned(frames):
+    """pd.concat yang mempertahankan dtype category (kategori digabung)."""
+    frames = [f for f in frames if len(f)] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+
+    aligned = [{} for _ in frames]
+    for col in frames[0].columns:
+        dtypes = [f[col].dtype for f in frames]
+        if not all(isinstance(d, pd.CategoricalDtype) for d in dtypes):
+            continue
+        categories = dtypes[0].categories
+        for dtype in dtypes[1:]:
+            categories = categories.append(dtype.categories[~dtype.categories.isin(categories)])
+        for columns, f in zip(aligned, frames):
+            if not f[col].cat.categories.equals(categories):
+                columns[col] = f[col].cat.set_categories(categories)
+    frames = [f.assign(**columns) if columns else f for f, columns in zip(frames, aligned)]
+    return pd.concat(frames)
+
+
+class IncrementalSync:
+    """Snapshot data bersih yang diperbarui secara inkremental dari `source`."""
+
+    def __init__(self, source, clean_fn=clean_rows, snapshot_path=None, retry_interval=RETRY_INTERVAL):
+        self.source = source
+        self.clean_fn = clean_fn
+        self.snapshot_path = snapshot_path
+        self.retry_interval = retry_interval
+        self.last_stats = {}
+        self.last_error = None
+        self.failed_at = None
+        self.refreshed_at = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._state = None
+        self._current = None
+        self._background = None
+
+    def current(self):
+        """DataFrame bersih terakhir (None bila belum pernah dimuat)."""
+        return self._current
+
+    def get(self, max_age=None, today=None):
+        """DataFrame bersih terbaru dengan semantik stale-while-revalidate.
+
+        Hanya load pertama yang sinkron. Bila data sudah ada tetapi lebih tua
+        dari `max_age`, atau dibersihkan untuk tanggal selain `today`, versi
+        lama tetap dikembalikan sementara refresh berjalan di background.
+        """
+        if self._current is None:
+            with self._refresh_lock:
+                # Sesi lain mungkin sudah memuat data selagi kita menunggu
+                if self._current is None:
+                    return self.refresh()
+        elif self.is_stale(max_age, today) and not self.backing_off():
+            self.refresh_in_background()
+        return self._current
+
+    def backing_off(self):
+        """True selama `retry_interval` detik setelah refresh terakhir gagal."""
+        return self.failed_at is not None and time.time() - self.failed_at < self.retry_interval
+
+    def is_stale(self, max_age=None, today=None):
+        """True bila data lebih tua dari `max_age` atau hari sudah berganti."""
+        if today is None:
+            today = pd.Timestamp(datetime.now().date())
+        state = self._state
+        if state is not None and state['today'] != today:
+            return True
+        return max_age is not None and time.time() - self.refreshed_at > max_age
+
+    def refresh(self, today=None):
+        """Baca ulang sumber dan kembalikan DataFrame bersih terbaru."""
+        with span('source.read') as s:
+            df_raw = self.source.read()
+            s.rows, s.bytes = len(df_raw), frame_bytes(df_raw)
+        return self.apply(df_raw, today=today)
+
+    def refresh_guarded(self):
+        """Refresh yang dilewati bila refresh lain sedang berjalan.
+
+        Error tidak dilempar: dicatat di log dan di `last_error`/`failed_at`,
+        lalu `get()` menunggu `retry_interval` sebelum mencoba lagi.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return None
+        try:
+            df = self.refresh()
+            self.last_error = None
+            self.failed_at = None
+            return df
+        except Exception as exc:
+            self.last_error = exc
+            self.failed_at = time.time()
+            logger.exception("Refresh data dari %s gagal", getattr(self.source, 'name', self.source))
+            return None
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_in_background(self):
+        """Jalankan satu refresh di thread terpisah (bila belum ada yang berjalan)."""
+        if self._background is not None and self._background.is_alive():
+            return self._background
+        self._background = threading.Thread(target=self.refresh_guarded, name='data-refresh', daemon=True)
+        self._background.start()
+        return self._background
+
+    def restore(self):
+        """Pulihkan snapshot lokal terakhir; kembalikan DataFrame atau None.
+
+        Snapshot yang lebih tua dari `max_age` tetap langsung dilayani oleh
+        `get()`; refresh dari sumber berjalan di background, sehingga cold
+        start tidak pernah menunggu sumber selama snapshot masih ada.
+        """
+        if self.snapshot_path is None:
+            return None
+        try:
+            with span('snapshot.restore'):
+                snapshot = read_snapshot(self.snapshot_path)
+        except Exception:
+            logger.exception("Snapshot %s tidak dapat dibaca", self.snapshot_path)
+            return None
+        if snapshot is None:
+            return None
+
+        cleaned, hashes, meta = snapshot
+        source_key = self.source.key if self.source is not None else None
+        if meta.get('source') != source_key:
+            logger.info("Snapshot %s berasal dari sumber lain (%s), diabaikan", self.snapshot_path, meta.get('source'))
+            return None
+        with self._lock:
+            self._state = {
+                'columns': meta['raw_columns'],
+                'today': meta['today'],
+                'hashes': hashes,
+                'cleaned': cleaned,
+                # Data mentah tidak ikut snapshot: refresh pertama meng-hash semua baris
+                'raw': None,
+            }
+            df = self._publish(cleaned, meta['version'], meta['written_at'])
+        return df
+
+    def _publish(self, cleaned, version, refreshed_at):
+        df = drop_empty_columns(cleaned)
+        df.attrs['version'] = version
+        self._current = df
+        self.refreshed_at = refreshed_at
+        return df
+
+    def apply(self, df_raw, today=None):
+        if today is None:
+            today = pd.Timestamp(datetime.now().date())
+        state = self._state
+        with span('sync.hash') as s:
+            if state is not None and state.get('raw') is not None:
+                hashes = incremental_hashes(df_raw, state['raw'], state['hashes'])
+            else:
+                hashes = row_hashes(df_raw)
+            s.rows = len(df_raw)
+
+        with self._lock:
+            state = self._state
+            # Hasil cleaning bergantung pada skema dan tanggal hari ini
+            reusable = (
+                state is not None
+                and state['columns'] == list(df_raw.columns)
+                and state['today'] == today
+            )
+            if reusable:
+                old_hashes = pd.Index(state['hashes'])
+                first = ~old_hashes.duplicated()
+                lookup = pd.Series(np.flatnonzero(first), index=old_hashes[first])
+                old_pos = lookup.reindex(hashes).fillna(-1).to_numpy(dtype=np.int64)
+            else:
+                old_pos = np.full(len(df_raw), -1, dtype=np.int64)
+
+            reused = np.flatnonzero(old_pos >= 0)
+            changed = np.flatnonzero(old_pos < 0)
+
+            parts = []
+            if len(reused):
+                old_part = state['cleaned'].take(old_pos[reused])
+                old_part.index = df_raw.index[reused]
+                parts.append(old_part)
+            if len(changed) or not parts:
+                with span('sync.clean') as s:
+                    parts.append(self.clean_fn(df_raw.take(changed), today))
+                    s.rows = len(changed)
+
+            cleaned = concat_aligned(parts)
+            if len(parts) > 1:
+                order = np.argsort(np.concatenate([reused, changed]), kind='stable')
+                cleaned = cleaned.take(order)
+
+            self._state = {
+                'columns': list(df_raw.columns),
+                'today': today,
+                'hashes': hashes,
+                'cleaned': cleaned,
+                'raw': df_raw,
+            }
+            self.last_stats = {
+                'rows': len(df_raw),
+                'reused': len(reused),
+                'cleaned': len(changed),
+                'full': not reusable,
+            }
+
+            version = fingerprint(df_raw, hashes, today)
+            df = self._publish(cleaned, version, time.time())
+
+        if self.snapshot_path is not None:
+            meta = {
+                'version': version,
+                'today': today,
+                'raw_columns': list(df_raw.columns),
+                'source': self.source.key if self.source is not None else None,
+            }
+            try:
+                with span('snapshot.write') as s:
+                    write_snapshot(self.snapshot_path, cleaned, hashes, meta)
+                    s.rows, s.bytes = len(cleaned), os.path.getsize(self.snapshot_path)
+            except Exception:
+                logger.exception("Snapshot %s gagal ditulis", self.snapshot_path)
+        return df
@@ -0,0 +1,69 @@
+"""Akses data berbasis view atas satu frame dasar yang tidak diubah.
+
+Filter sidebar, filter karyawan aktif, dan sub-seleksi (pensiun, resign,
+dst.) hanya menghasilkan array posisi baris. Kolom diambil dengan `take`
+saat benar-benar dibaca dan di-cache per view, sehingga satu sesi cukup
+memegang frame dasar bersama ditambah beberapa array indeks kecil.
+
+`DataView` meniru bagian kecil API DataFrame yang dipakai dashboard
+(`columns`, `empty`, `shape`, `view[kolom]`, `view[mask]`,
+`view[[kolom, ...]]`), sehingga kode yang sama bisa menerima keduanya.
+"""
+import numpy as np
+import pandas as pd
+
+
+class DataView:
+    """Seleksi baris (posisi) atas `base`; `base` tidak pernah dimodifikasi."""
+
+    def __init__(self, base, rows=None):
+        self.base = base
+        self.rows = None if rows is None else np.asarray(rows, dtype=np.intp)
+        self._cache = {}
+
+    @property
+    def columns(self):
+        return self.base.columns
+
+    @property
+    def attrs(self):
+        return self.base.attrs
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def shape(self):
+        return (len(self), len(self.base.columns))
+
+    def __len__(self):
+        return len(self.base) if self.rows is None else len(self.rows)
+
+    def __getitem__(self, key):
+        if isinstance(key, (pd.Series, np.ndarray)):
+            return self.where(key)
+        if isinstance(key, list):
+            return self.frame(key)
+        return self.column(key)
+
+    def column(self, col):
+        """Satu kolom untuk baris-baris view ini (read-only)."""
+        if self.rows is None:
+            return self.base[col]
+        if col not in self._cache:
+            self._cache[col] = self.base[col].take(self.rows)
+        return self._cache[col]
+
+    def where(self, mask):
+        """View baru berisi baris yang `mask`-nya True (NA dianggap False)."""
+        if isinstance(mask, pd.Series):
+            mask = mask.to_numpy(dtype=bool, na_value=False)
+        positions = np.flatnonzero(mask)
+        rows = positions if self.rows is None else self.rows[positions]
+        return DataView(self.base, rows)
+
+    def frame(self, columns=None):
+        """Materialisasi view menjadi DataFrame, hanya untuk tampilan/ekspor."""
+        base = self.base if columns is None else self.base[columns]
+        return base if self.rows is None else base.take(self.rows)